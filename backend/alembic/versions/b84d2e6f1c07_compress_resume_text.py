@@ -0,0 +1,120 @@
+"""Store resume text compressed, with preview and char_count
+
+Revision ID: b84d2e6f1c07
+Revises: 7a1e4c9f2b58
+Create Date: 2025-12-11 10:47:12.284519
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84d2e6f1c07'
+down_revision: Union[str, Sequence[str], None] = '7a1e4c9f2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+PREVIEW_CHARS = 500
+
+# Frozen copy of the app.core.compression format, so this migration keeps
+# working if the app's codec changes later.
+FORMAT_RAW = 0x00
+FORMAT_ZLIB = 0x01
+
+
+def _compress(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    packed = zlib.compress(raw, 6)
+    if len(packed) < len(raw):
+        return bytes([FORMAT_ZLIB]) + packed
+    return bytes([FORMAT_RAW]) + raw
+
+
+def _decompress(blob: bytes) -> str:
+    if blob[0] == FORMAT_ZLIB:
+        return zlib.decompress(blob[1:]).decode("utf-8")
+    return bytes(blob[1:]).decode("utf-8")
+
+
+def _preview(text: str) -> str:
+    return (text[:PREVIEW_CHARS] + '...') if len(text) > PREVIEW_CHARS else text
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resumes', sa.Column('extracted_text_compressed', sa.LargeBinary(), nullable=True))
+    op.add_column('resumes', sa.Column('text_preview', sa.Text(), server_default='', nullable=False))
+    op.add_column('resumes', sa.Column('char_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill in id order, BATCH_SIZE rows at a time
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, extracted_text FROM resumes "
+                "WHERE id > :last_id ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text(
+                "UPDATE resumes SET extracted_text_compressed = :blob, "
+                "text_preview = :preview, char_count = :chars WHERE id = :id"
+            ),
+            [
+                {
+                    "id": row.id,
+                    "blob": _compress(row.extracted_text),
+                    "preview": _preview(row.extracted_text),
+                    "chars": len(row.extracted_text),
+                }
+                for row in rows
+            ]
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('resumes', 'extracted_text_compressed', nullable=False)
+    op.drop_column('resumes', 'extracted_text')
+
+    # The history listing now also returns char_count
+    op.drop_index('ix_resumes_user_id_uploaded_at_id', table_name='resumes')
+    op.create_index('ix_resumes_user_id_uploaded_at_id', 'resumes', ['user_id', 'uploaded_at', 'id'], unique=False, postgresql_include=['original_filename', 'char_count'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resumes_user_id_uploaded_at_id', table_name='resumes')
+    op.create_index('ix_resumes_user_id_uploaded_at_id', 'resumes', ['user_id', 'uploaded_at', 'id'], unique=False, postgresql_include=['original_filename'])
+
+    op.add_column('resumes', sa.Column('extracted_text', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, extracted_text_compressed FROM resumes "
+                "WHERE id > :last_id ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE resumes SET extracted_text = :text WHERE id = :id"),
+            [{"id": row.id, "text": _decompress(row.extracted_text_compressed)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('resumes', 'extracted_text', nullable=False)
+    op.drop_column('resumes', 'char_count')
+    op.drop_column('resumes', 'text_preview')
+    op.drop_column('resumes', 'extracted_text_compressed')
@@ -7,7 +7,11 @@ from app.db.database import get_db
 from app.schemas.user import User, UserCreate
 from app.schemas.token import Token
 from app.services import user_service
-from app.core.security import verify_password, create_access_token
+from app.core.security import (
+    PasswordHasherOverloaded,
+    create_access_token,
+    verify_password_async,
+)
 from app.core.config import settings
 
 router = APIRouter()
@@ -27,7 +31,14 @@ async def register_user(
             detail="An account with this email already exists.",
         )
     
-    new_user = await user_service.create_user(db, user_create=user_in)
+    try:
+        new_user = await user_service.create_user(db, user_create=user_in)
+    except PasswordHasherOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "2"},
+        )
     return new_user
 
 @router.post("/login", response_model=Token)
@@ -42,8 +53,19 @@ async def login_for_access_token(
     # 3. Use form_data.username, NOT user_in.email
     user = await user_service.get_user_by_email(db, email=form_data.username)
     
-    # 4. Use form_data.password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # 4. Use form_data.password (verified off the event loop)
+    try:
+        password_ok = user is not None and await verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except PasswordHasherOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "2"},
+        )
+
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db
+from app.db.models import User
+from app.core.dependencies import get_current_user
+from app.schemas.job import JobStatusResponse, JobSubmitResponse
+from app.schemas.resume import ResumeOptimizeRequest
+from app.schemas.skill_gap import SkillGapRequest
+from app.services import job_queue_service, skill_gap_service
+
+router = APIRouter()
+
+async def _ensure_resume_exists(db: AsyncSession, resume_id: int, user: User) -> None:
+    # Fail fast on a bad resume id instead of queueing a doomed job
+    resume = await skill_gap_service.get_resume_by_id(db, resume_id=resume_id, user=user)
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found or does not belong to user."
+        )
+
+@router.post(
+    "/skill-gap",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_skill_gap_job(
+    request: SkillGapRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queues a skill-gap analysis and returns a job id to poll at /jobs/{job_id}.
+    """
+    await _ensure_resume_exists(db, request.resume_id, current_user)
+    job = await job_queue_service.enqueue_job(
+        db, user=current_user, kind="skill_gap", payload=request.model_dump()
+    )
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+@router.post(
+    "/optimize",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_optimize_job(
+    request: ResumeOptimizeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queues a resume optimization and returns a job id to poll at /jobs/{job_id}.
+    """
+    await _ensure_resume_exists(db, request.resume_id, current_user)
+    job = await job_queue_service.enqueue_job(
+        db, user=current_user, kind="optimize", payload=request.model_dump()
+    )
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns a job's status, and its result once it has succeeded.
+    Finished jobs are kept for JOB_RESULT_TTL_HOURS.
+    """
+    job = await job_queue_service.get_job(db, user=current_user, job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or expired."
+        )
+    return job
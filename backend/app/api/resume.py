@@ -1,19 +1,22 @@
-import io
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.db.models import User
+from app.core import metrics
+from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.schemas.resume import ResumeCreate, ResumeUploadResponse
 from app.services import resume_service
 
 from app.schemas.resume import ResumeOptimizeRequest, ResumeOptimizeResponse
-from app.services import role_service, skill_gap_service
+from app.services import gemini_gateway, role_service, skill_gap_service
 
+from app.schemas.resume import ResumeHistoryPage, ResumeInfo
 from typing import List
-# Add your new schema
-from app.schemas.resume import ResumeInfo
 
 router = APIRouter()
 
@@ -21,19 +24,51 @@ router = APIRouter()
 @router.get(
     "/history", 
     response_model=List[ResumeInfo],
-    tags=["Resumes"]
+    tags=["Resumes"],
+    deprecated=True
 )
 async def get_resume_history(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieves a list of all resumes uploaded by the current user.
+    Retrieves every resume uploaded by the current user, newest first.
+    Kept for existing clients; use /resume/history/page, which pages
+    through them with a cursor.
     """
-    resumes = await resume_service.get_resumes_by_user(db, user=current_user)
+    resumes, _ = await resume_service.get_resumes_by_user(
+        db, user=current_user, limit=None
+    )
     return resumes
 
 
+@router.get(
+    "/history/page",
+    response_model=ResumeHistoryPage,
+    tags=["Resumes"]
+)
+async def get_resume_history_page(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="The next_cursor of the previous page."),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Retrieves the resumes uploaded by the current user, newest first,
+    one page at a time.
+    """
+    try:
+        resumes, next_cursor = await resume_service.get_resumes_by_user(
+            db, user=current_user, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return ResumeHistoryPage(items=resumes, next_cursor=next_cursor)
+
+
 @router.post("/upload", response_model=ResumeUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_resume(
     file: UploadFile = File(...),
@@ -42,6 +77,7 @@ async def upload_resume(
 ):
     """
     Upload a resume PDF, extract its text, and save it for the user.
+    Re-uploading an identical file returns the existing resume.
     """
     if file.content_type != "application/pdf":
         raise HTTPException(
@@ -49,13 +85,30 @@ async def upload_resume(
             detail="Invalid file type. Only PDF files are accepted."
         )
 
+    upload = None
     try:
-        # Read file content into memory
-        file_content = await file.read()
-        file_stream = io.BytesIO(file_content)
+        # Copy the upload in bounded chunks (spooled to disk if large)
+        upload = await resume_service.spool_upload(
+            file,
+            max_bytes=settings.MAX_UPLOAD_BYTES,
+            spool_threshold=settings.UPLOAD_SPOOL_THRESHOLD_BYTES
+        )
+
+        # The same file was uploaded before: reuse it instead of re-parsing
+        with metrics.stage("pdf_extract", "dedup_lookup") as timer:
+            existing_resume = await resume_service.get_resume_by_content_hash(
+                db, content_sha256=upload.sha256, user=current_user
+            )
+            timer.cache = "hit" if existing_resume else "miss"
+        if existing_resume:
+            return ResumeUploadResponse(
+                resume_id=existing_resume.id,
+                original_filename=existing_resume.original_filename,
+                extracted_text_preview=existing_resume.text_preview
+            )
 
-        # Extract text
-        extracted_text = resume_service.extract_text_from_pdf(file_stream)
+        # Extract text (in the extraction process pool)
+        extracted_text = await resume_service.extract_text_from_pdf_async(upload.source)
         
         if extracted_text.startswith("Error:"):
             raise HTTPException(
@@ -66,7 +119,8 @@ async def upload_resume(
         # Create the resume schema
         resume_data = ResumeCreate(
             original_filename=file.filename,
-            extracted_text=extracted_text
+            extracted_text=extracted_text,
+            content_sha256=upload.sha256
         )
 
         # Save to database
@@ -74,21 +128,34 @@ async def upload_resume(
             db=db, resume_data=resume_data, user=current_user
         )
 
-        # Return a preview of the text (e.g., first 500 chars)
-        preview = (extracted_text[:500] + '...') if len(extracted_text) > 500 else extracted_text
-        
+        # Return a preview of the text (stored alongside it on upload)
         return ResumeUploadResponse(
             resume_id=new_resume.id,
             original_filename=new_resume.original_filename,
-            extracted_text_preview=preview
+            extracted_text_preview=new_resume.text_preview
         )
     
+    except HTTPException:
+        raise
+    except resume_service.UploadTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except resume_service.ExtractionPoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
     finally:
+        if upload is not None:
+            upload.close()
         await file.close()
 
 @router.post("/optimize", response_model=ResumeOptimizeResponse)
@@ -103,7 +170,7 @@ async def optimize_resume(
     """
     # 1. Get the user's resume
     resume = await skill_gap_service.get_resume_by_id(
-        db, resume_id=request.resume_id, user=current_user
+        db, resume_id=request.resume_id, user=current_user, with_text=True
     )
     if not resume:
         raise HTTPException(
@@ -123,9 +190,84 @@ async def optimize_resume(
         )
 
     # 3. Call AI to generate the optimized text
-    optimized_text = await resume_service.generate_optimized_resume(
-        resume_text=resume.extracted_text,
-        role_profile=role_profile
+    try:
+        optimized_text = await resume_service.generate_optimized_resume(
+            resume_text=resume.extracted_text,
+            role_profile=role_profile
+        )
+    except gemini_gateway.GeminiOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "10"}
+        )
+
+    return ResumeOptimizeResponse(optimized_resume_text=optimized_text)
+
+@router.post("/optimize/stream")
+async def optimize_resume_stream(
+    request: ResumeOptimizeRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streaming version of /optimize. Sends the optimized resume as
+    server-sent events while Gemini generates it:
+
+    - `data: {"text": "..."}` for each chunk of text
+    - `event: error` if generation fails midway
+    - `event: done` once the resume is complete
+    """
+    # 1. Get the user's resume
+    resume = await skill_gap_service.get_resume_by_id(
+        db, resume_id=request.resume_id, user=current_user, with_text=True
     )
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found."
+        )
 
-    return ResumeOptimizeResponse(optimized_resume_text=optimized_text)
\ No newline at end of file
+    # 2. Get the target role profile
+    try:
+        role_profile = await role_service.get_or_create_role_profile(
+            db, role_name=request.role_name
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to analyze role: {str(e)}"
+        )
+
+    resume_text = resume.extracted_text
+
+    # 3. Forward Gemini's output as it arrives
+    async def event_stream():
+        stream = resume_service.stream_optimized_resume(
+            resume_text=resume_text,
+            role_profile=role_profile
+        )
+        async with aclosing(stream) as chunks:
+            try:
+                async for text_chunk in chunks:
+                    # Stop generating (and paying) once the client is gone
+                    if await http_request.is_disconnected():
+                        return
+                    yield f"data: {json.dumps({'text': text_chunk})}\n\n"
+            except Exception as e:
+                print(f"Error streaming Gemini resume optimization: {e}")
+                error = {"detail": "Could not generate optimized resume."}
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+                return
+
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no", # Don't let nginx buffer the stream
+        }
+    )
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.db.models import User
 from app.core.dependencies import get_current_user
-from app.schemas.skill_gap import SkillGapRequest, GeminiSkillGapSchema
-from app.services import skill_gap_service, role_service
+from app.schemas.skill_gap import (
+    AnalysisHistoryDetail,
+    AnalysisHistoryInfo,
+    GeminiSkillGapSchema,
+    SkillGapBatchRequest,
+    SkillGapBatchResponse,
+    SkillGapRequest,
+    SkillMatchPreview,
+)
+from app.services import gemini_gateway, skill_gap_service, role_service
+from typing import List
 
 router = APIRouter()
 
@@ -45,20 +54,156 @@ async def analyze_skill_gap(
             detail=f"Failed to analyze role: {str(e)}"
         )
 
-    # 3. Call the AI service to generate the analysis
+    # 3. Serve a saved analysis if the inputs haven't changed
+    saved_analysis = await skill_gap_service.get_saved_analysis(
+        db,
+        user=current_user,
+        resume_id=resume.id,
+        role_profile=role_profile,
+        learning_preference=request.learning_preference
+    )
+    if saved_analysis:
+        return saved_analysis
+
+    # 4. Call the AI service to generate the analysis
+    await skill_gap_service.load_resume_text(db, resume)
     try:
         analysis_result = await skill_gap_service.generate_skill_gap_analysis(
             resume_text=resume.extracted_text,
             role_profile=role_profile,
             learning_preference=request.learning_preference
         )
-        return analysis_result
+    except gemini_gateway.GeminiOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "10"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate skill gap analysis: {str(e)}"
         )
 
+    # 5. Save it to the user's history
+    await skill_gap_service.save_analysis(
+        db,
+        user=current_user,
+        resume_id=resume.id,
+        role_profile=role_profile,
+        learning_preference=request.learning_preference,
+        analysis=analysis_result
+    )
+    return analysis_result
+
+@router.post(
+    "/analyze/batch",
+    response_model=SkillGapBatchResponse,
+    tags=["Skill Gap"]
+)
+async def analyze_skill_gap_batch(
+    request: SkillGapBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Analyzes one resume against several roles (up to 5) concurrently.
+    Each role gets either a result or its own error, so one failing role
+    doesn't fail the whole batch.
+    """
+    # Load the resume once for all roles
+    resume = await skill_gap_service.get_resume_by_id(
+        db, resume_id=request.resume_id, user=current_user, with_text=True
+    )
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found or does not belong to user."
+        )
+
+    results = await skill_gap_service.analyze_resume_for_roles(
+        user=current_user,
+        resume=resume,
+        role_names=request.role_names,
+        learning_preference=request.learning_preference
+    )
+    return SkillGapBatchResponse(resume_id=resume.id, results=results)
+
+@router.post(
+    "/preview",
+    response_model=SkillMatchPreview,
+    tags=["Skill Gap"]
+)
+async def preview_skill_gap(
+    request: SkillGapRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Instant local match score: which of the role's skills appear verbatim
+    in the resume. Doesn't call the AI for the analysis itself.
+    """
+    resume = await skill_gap_service.get_resume_by_id(
+        db, resume_id=request.resume_id, user=current_user, with_text=True
+    )
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found or does not belong to user."
+        )
+
+    try:
+        role_profile = await role_service.get_or_create_role_profile(
+            db, role_name=request.role_name
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to analyze role: {str(e)}"
+        )
+
+    return skill_gap_service.preview_skill_match(resume.extracted_text, role_profile)
+
+@router.get(
+    "/history",
+    response_model=List[AnalysisHistoryInfo],
+    tags=["Skill Gap"]
+)
+async def get_analysis_history(
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Lists the current user's past analyses, newest first.
+    """
+    return await skill_gap_service.get_analyses_by_user(
+        db, user=current_user, limit=limit
+    )
+
+@router.get(
+    "/history/{analysis_id}",
+    response_model=AnalysisHistoryDetail,
+    tags=["Skill Gap"]
+)
+async def get_analysis(
+    analysis_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves a single past analysis, without calling the AI again.
+    """
+    analysis = await skill_gap_service.get_analysis_by_id(
+        db, user=current_user, analysis_id=analysis_id
+    )
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found."
+        )
+    return analysis
+
 # ---
 # Note: In our original plan, we had /resume/skill-gap
 # I'm creating a new file /api/skill_gap.py with a route /analyze
@@ -0,0 +1,29 @@
+import zlib
+
+# The first byte of every stored blob says how the rest is encoded, so the
+# codec can change later without rewriting old rows.
+FORMAT_RAW = 0x00  # Plain UTF-8 (used when compressing doesn't pay off)
+FORMAT_ZLIB = 0x01 # zlib-compressed UTF-8
+
+ZLIB_LEVEL = 6
+
+
+def compress_text(text: str) -> bytes:
+    """Encodes text as a version byte followed by the (compressed) UTF-8 bytes."""
+    raw = text.encode("utf-8")
+    packed = zlib.compress(raw, ZLIB_LEVEL)
+    if len(packed) < len(raw):
+        return bytes([FORMAT_ZLIB]) + packed
+    return bytes([FORMAT_RAW]) + raw
+
+
+def decompress_text(blob: bytes) -> str:
+    """Decodes a blob written by compress_text."""
+    if not blob:
+        return ""
+    version, payload = blob[0], blob[1:]
+    if version == FORMAT_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if version == FORMAT_RAW:
+        return bytes(payload).decode("utf-8")
+    raise ValueError(f"Unknown text format version: {version}")
@@ -10,14 +10,98 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Size the pool against the instance's request concurrency: each request
+    # (and each job worker) holds at most one connection at a time.
+    DB_POOL_SIZE: int = 5 # Connections kept open per worker
+    DB_MAX_OVERFLOW: int = 10 # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0 # How long a checkout waits before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800 # Reconnect connections older than this
+    DB_POOL_PRE_PING: bool = True # Test connections on checkout (drops dead ones)
+    # Prepared statements cached per connection, by SQLAlchemy's asyncpg adapter and by
+    # asyncpg itself. 0 turns the caching off (e.g. behind PgBouncer in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SLOW_QUERY_SECONDS: float = 0.5 # Statements slower than this are logged
 
     # Google AI
     GOOGLE_API_KEY: str
+    GEMINI_MAX_CONCURRENCY: int = 16 # Gemini calls in flight per worker
+    GEMINI_ENDPOINT_MAX_CONCURRENCY: int = 8 # ...and per calling endpoint
+    GEMINI_MAX_QUEUE: int = 64 # Calls allowed to wait for a slot before we reject
+    GEMINI_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    # "sdk" uses google-generativeai; "rest" calls the REST API directly through
+    # the shared HTTP client (and can point at a local stand-in for load tests)
+    GEMINI_TRANSPORT: str = "sdk"
+    GEMINI_API_BASE_URL: str = "https://generativelanguage.googleapis.com"
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Decoded tokens and authenticated users are cached per worker for this long
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_SIZE: int = 1024
+
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 4 # Threads running bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 32 # Hash jobs queued or running before we return 503
+
+    # Outbound HTTP (shared client)
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 20.0
+
+    # Job board (Arbeitnow)
+    ARBEITNOW_API_URL: str = "https://www.arbeitnow.com/api/job-board-api"
+    # Response cache
+    JOB_BOARD_CACHE_TTL_SECONDS: int = 1800 # Served without asking the API at all
+    JOB_BOARD_CACHE_SIZE: int = 256
+    JOB_FETCH_MAX_PAGES: int = 5
+    JOB_FETCH_FAN_OUT: int = 3 # Pages fetched concurrently
+    JOB_FETCH_DEADLINE_SECONDS: float = 10.0 # Overall budget for fetching a role's jobs
+    JOB_PROMPT_TOKEN_BUDGET: int = 12000 # Approximate tokens of job text sent to Gemini
+    JOB_NEAR_DUPLICATE_THRESHOLD: float = 0.8 # Estimated similarity above which a posting is a repost
+
+    # Role profiles
+    # Serialize profile writes across workers with a Postgres advisory lock
+    ROLE_PROFILE_ADVISORY_LOCK: bool = True
+    # Serve stale profiles immediately and refresh them in the background...
+    ROLE_PROFILE_SERVE_STALE: bool = True
+    # ...unless they are older than this, in which case the request waits
+    ROLE_PROFILE_HARD_EXPIRY_DAYS: int = 30
+    # Max number of fresh profiles kept in memory per worker
+    ROLE_PROFILE_CACHE_SIZE: int = 256
+
+    # Skill gap
+    SKILL_GAP_BATCH_CONCURRENCY: int = 3 # Roles analyzed at once in a batch request
+
+    # Background AI jobs (submit/poll mode)
+    JOB_WORKERS: int = 2 # In-process workers per app instance; 0 disables them
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0 # Doubled after each failed attempt
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 600 # A running job older than this is picked up again
+    JOB_RESULT_TTL_HOURS: int = 24
+
+    # Resume uploads
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_SPOOL_THRESHOLD_BYTES: int = 1024 * 1024 # Larger uploads are spooled to disk
+
+    # PDF extraction
+    PDF_EXTRACT_WORKERS: int = 2 # Worker processes in the extraction pool
+    PDF_EXTRACT_MAX_CONCURRENCY: int = 4 # Jobs allowed in the pool at once
+    PDF_EXTRACT_QUEUE_TIMEOUT_SECONDS: float = 2.0 # How long to wait for a free slot
+    PDF_EXTRACT_TIMEOUT_SECONDS: float = 20.0
+    PDF_MAX_PAGES: int = 30
+
+    # Startup warm-up (runs after the server starts; /ready is 503 until it's done)
+    WARMUP_DB_CONNECTIONS: int = 3 # Pooled connections opened up front (capped at DB_POOL_SIZE)
+    WARMUP_ROLE_PROFILES: int = 50 # Most-analyzed role profiles loaded into the memory cache
+    WARMUP_HTTP: bool = True # Open connections (and TLS sessions) to Gemini and Arbeitnow
+    WARMUP_GEMINI_MODELS: bool = True # Import the Gemini SDK and build the model objects
+    WARMUP_TIMEOUT_SECONDS: float = 30.0 # Report ready after this even if a step hasn't finished
 
 # Create a single instance to be imported elsewhere
 settings = Settings()
\ No newline at end of file
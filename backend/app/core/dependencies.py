@@ -1,11 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
 from pydantic import ValidationError
 
 from app.db.database import get_db
-from app.core.config import settings
+from app.core.security import InvalidToken, decode_access_token
 from app.schemas.token import TokenData
 from app.services import user_service
 from app.db.models import User
@@ -19,6 +18,7 @@ async def get_current_user(
 ) -> User:
     """
     Decodes the JWT token, validates it, and returns the current user.
+    Both steps are cached briefly, so most requests skip the DB lookup.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,10 +27,8 @@ async def get_current_user(
     )
     
     try:
-        # Decode the JWT
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        # Decode the JWT (cached for repeated requests with the same token)
+        payload = decode_access_token(token)
         # The "sub" (subject) of our token is the user's email
         email: str = payload.get("sub")
         if email is None:
@@ -38,11 +36,11 @@ async def get_current_user(
         
         # Validate the token data
         token_data = TokenData(email=email)
-    except (JWTError, ValidationError):
+    except (InvalidToken, ValidationError):
         raise credentials_exception
     
-    # Fetch the user from the database
-    user = await user_service.get_user_by_email(db, email=token_data.email)
+    # Fetch the user (from the short-lived cache, or the database)
+    user = await user_service.get_user_by_email_cached(db, email=token_data.email)
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,56 @@
+import asyncio
+from typing import List
+
+import httpx
+
+from app.core.config import settings
+
+# One AsyncClient for the whole application, so outbound calls reuse
+# pooled connections (and TLS sessions) instead of opening new ones.
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+                read=settings.HTTP_READ_TIMEOUT_SECONDS,
+                write=settings.HTTP_READ_TIMEOUT_SECONDS,
+                pool=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+            headers={"User-Agent": "SkillSync-AI/0.1"}
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Closes the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def warm_http_client(urls: List[str]) -> int:
+    """
+    Opens a pooled connection (including the TLS handshake) to each URL's
+    host with a HEAD request, so the first real call reuses it. Any
+    response counts, even an error status. Returns how many hosts answered.
+    """
+    client = get_http_client()
+    results = await asyncio.gather(
+        *(client.head(url) for url in urls), return_exceptions=True
+    )
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            print(f"HTTP warm-up to {url} failed: {result}")
+    return sum(1 for result in results if not isinstance(result, Exception))
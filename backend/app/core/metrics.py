@@ -0,0 +1,298 @@
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. number of requests."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        """For counts kept elsewhere (e.g. by a cache), copied in by a collector."""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    """Counts observations (e.g. latencies) into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            bucket_counts, total, count = self._values.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[i] += 1
+            self._values[key] = (bucket_counts, total + value, count + 1)
+
+    def values(self) -> Dict[LabelValues, Tuple[List[int], float, int]]:
+        with self._lock:
+            return {
+                key: (list(bucket_counts), total, count)
+                for key, (bucket_counts, total, count) in self._values.items()
+            }
+
+
+# --- Registry ---
+# Metrics are module-level singletons, registered once by name.
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+# Called before each render, to copy in values that are kept elsewhere
+# (cache counters, pool usage) instead of being recorded as they change
+_collectors: List[Callable[[], None]] = []
+
+
+def _register(metric_class, name: str, *args, **kwargs):
+    with _registry_lock:
+        existing = _registry.get(name)
+        if existing is not None:
+            if not isinstance(existing, metric_class):
+                raise ValueError(f"Metric '{name}' is already registered as a {existing.kind}")
+            return existing
+        metric = metric_class(name, *args, **kwargs)
+        _registry[name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    """Returns the counter with this name, creating it if needed."""
+    return _register(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    """Returns the gauge with this name, creating it if needed."""
+    return _register(Gauge, name, documentation, labelnames)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    """Returns the histogram with this name, creating it if needed."""
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    """Registers a function that updates some metrics right before they're rendered."""
+    with _registry_lock:
+        _collectors.append(collector)
+
+
+def all_metrics() -> List[_Metric]:
+    """Returns every registered metric, sorted by name."""
+    with _registry_lock:
+        return [_registry[name] for name in sorted(_registry)]
+
+
+# --- Prometheus text format ---
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Renders every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        collectors = list(_collectors)
+    for collector in collectors:
+        try:
+            collector()
+        except Exception as e:
+            print(f"Metrics collector {collector.__qualname__} failed: {e}")
+
+    lines: List[str] = []
+    for metric in all_metrics():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        if isinstance(metric, Histogram):
+            for label_values, (bucket_counts, total, count) in sorted(metric.values().items()):
+                for upper_bound, bucket_count in zip(metric.buckets, bucket_counts):
+                    labels = _format_labels(
+                        metric.labelnames + ("le",), label_values + (_format_value(upper_bound),)
+                    )
+                    lines.append(f"{metric.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(metric.labelnames + ("le",), label_values + ("+Inf",))
+                lines.append(f"{metric.name}_bucket{labels} {count}")
+                labels = _format_labels(metric.labelnames, label_values)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{labels} {count}")
+        else:
+            for label_values, value in sorted(metric.values().items()):
+                labels = _format_labels(metric.labelnames, label_values)
+                lines.append(f"{metric.name}{labels} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Pipeline stage timing ---
+# The endpoint label comes from a context variable, set per request by the
+# middleware in app.main (and per job by the job workers), so services
+# don't need to be told who called them.
+
+_current_endpoint: ContextVar[str | Callable[[], str]] = ContextVar("metrics_endpoint", default="none")
+
+
+def set_endpoint(endpoint: str | Callable[[], str]) -> Token:
+    """
+    Labels metrics recorded in the current context with this endpoint, or
+    with what the function returns when they're recorded (a request's
+    route is only known once the request has been routed).
+    """
+    return _current_endpoint.set(endpoint)
+
+
+def reset_endpoint(token: Token) -> None:
+    _current_endpoint.reset(token)
+
+
+def current_endpoint() -> str:
+    endpoint = _current_endpoint.get()
+    return endpoint() if callable(endpoint) else endpoint
+
+
+PIPELINE_STAGE_SECONDS = histogram(
+    "pipeline_stage_seconds",
+    "Time spent in each stage of the AI pipelines.",
+    labelnames=("pipeline", "stage", "endpoint", "outcome", "cache")
+)
+
+
+class StageTimer:
+    """Handed out by stage(); set cache or outcome on it before the block ends."""
+
+    def __init__(self, cache: str):
+        self.cache = cache
+        self.outcome: str | None = None # Defaults to ok / error / cancelled
+
+
+@contextmanager
+def stage(pipeline: str, name: str, cache: str = "none") -> Iterator[StageTimer]:
+    """
+    Times a block as one stage of a pipeline, e.g.
+
+        with metrics.stage("skill_gap", "gemini"):
+            response_text = await gemini_gateway.generate(...)
+    """
+    timer = StageTimer(cache)
+    outcome = "ok"
+    start = time.perf_counter()
+    try:
+        yield timer
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        PIPELINE_STAGE_SECONDS.observe(
+            time.perf_counter() - start,
+            pipeline=pipeline,
+            stage=name,
+            endpoint=current_endpoint(),
+            outcome=timer.outcome or outcome,
+            cache=timer.cache
+        )
@@ -1,21 +1,128 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context, created on first use. passlib and jose are
+# imported inside the functions that need them, so a cold start that only
+# serves health checks doesn't load them.
+_pwd_context = None
+
+# bcrypt is slow on purpose (~200ms) and releases the GIL, so it runs in
+# its own bounded thread pool instead of on the event loop.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_jobs_pending = 0
+
+PASSWORD_HASH_SECONDS = metrics.histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password, including time queued for a thread.",
+    labelnames=("operation",)
+)
+PASSWORD_HASH_REJECTED = metrics.counter(
+    "password_hash_rejected_total",
+    "Hash jobs rejected because the pool's queue was full.",
+    labelnames=("operation",)
+)
+PASSWORD_HASH_PENDING = metrics.gauge(
+    "password_hash_pending",
+    "Hash jobs queued or running."
+)
+
+
+# Claims of recently verified tokens, keyed by the raw token string
+_token_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+
+class PasswordHasherOverloaded(Exception):
+    """Raised when too many hash jobs are already queued."""
+
+class InvalidToken(Exception):
+    """Raised when a JWT fails verification (bad signature, expired, malformed)."""
+
+def _get_pwd_context():
+    """Returns the passlib context, creating it on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain-text password against a hashed one."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hashes a plain-text password."""
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
+
+async def _run_hash_job(operation: str, func, *args):
+    """
+    Runs a hashing function in the hash pool, rejecting the job if
+    PASSWORD_HASH_MAX_PENDING jobs are already waiting or running.
+    """
+    global _hash_jobs_pending
+
+    if _hash_jobs_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.inc(operation=operation)
+        raise PasswordHasherOverloaded("The server is busy. Please try again shortly.")
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    _hash_jobs_pending += 1
+    PASSWORD_HASH_PENDING.set(_hash_jobs_pending)
+
+    def _finish() -> None:
+        global _hash_jobs_pending
+        _hash_jobs_pending -= 1
+        PASSWORD_HASH_PENDING.set(_hash_jobs_pending)
+        PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, operation=operation)
+
+    def _on_done(_) -> None:
+        # Attached to the thread's own future, so it runs once the hash is
+        # actually finished (or dropped from the queue), even if the caller
+        # was cancelled. It runs in the worker thread, hence the hop back
+        # to the event loop.
+        try:
+            loop.call_soon_threadsafe(_finish)
+        except RuntimeError:
+            pass # The event loop is already closed (shutdown)
+
+    try:
+        job = _hash_executor.submit(func, *args)
+    except Exception:
+        _finish()
+        raise
+    job.add_done_callback(_on_done)
+    return await asyncio.wrap_future(job)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password in the hash pool.
+    Raises PasswordHasherOverloaded if the pool is saturated.
+    """
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hashes a password in the hash pool.
+    Raises PasswordHasherOverloaded if the pool is saturated.
+    """
+    return await _run_hash_job("hash", get_password_hash, password)
+
+def shutdown_hash_executor() -> None:
+    """Stops the hash pool's threads."""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Creates a new JWT access token."""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -24,4 +131,28 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verifies a JWT and returns its claims. Raises InvalidToken if it's invalid.
+
+    Verified claims are cached for a short while (never past the token's
+    expiry), so repeated requests with the same token skip the signature check.
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise InvalidToken(str(e)) from e
+
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        ttl = min(settings.AUTH_CACHE_TTL_SECONDS, expires_at - time.time())
+        _token_cache.set(token, payload, ttl=ttl)
+    return payload
@@ -1,10 +1,185 @@
+import asyncio
+import time
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics
 from app.core.config import settings
 import asyncpg
 
+DB_POOL_CHECKOUT_WAIT_SECONDS = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (including connecting)."
+)
+DB_POOL_CHECKED_OUT = metrics.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool."
+)
+DB_POOL_SATURATION = metrics.gauge(
+    "db_pool_saturation",
+    "Checked-out connections as a fraction of pool_size + max_overflow."
+)
+DB_POOL_TIMEOUTS = metrics.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS."
+)
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_seconds",
+    "Statement execution time.",
+    labelnames=("operation",)
+)
+DB_SLOW_QUERIES = metrics.counter(
+    "db_slow_queries_total",
+    "Statements slower than DB_SLOW_QUERY_SECONDS.",
+    labelnames=("operation",)
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """The default async pool, plus checkout wait time and saturation metrics."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - start)
+        self._record_usage()
+        return conn
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        checked_out = self.checkedout()
+        DB_POOL_CHECKED_OUT.set(checked_out)
+        capacity = self.size() + max(self._max_overflow, 0)
+        DB_POOL_SATURATION.set(checked_out / capacity if capacity else 0.0)
+
+
+def _engine_connect_args() -> dict:
+    if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        # SQLAlchemy's asyncpg adapter prepares statements through its own
+        # cache (prepared_statement_cache_size), not asyncpg's
+        # (statement_cache_size), so both get the same size
+        return {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return {}
+
+
 # Create the async engine
-engine = create_async_engine(settings.DATABASE_URL)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_engine_connect_args()
+)
+
+
+def get_pool_stats() -> dict:
+    """Current pool usage of this worker."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
+
+
+DB_POOL_IDLE = metrics.gauge(
+    "db_pool_idle",
+    "Connections open and idle in the pool."
+)
+DB_POOL_OVERFLOW = metrics.gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size."
+)
+
+
+def _collect_pool_metrics() -> None:
+    stats = get_pool_stats()
+    DB_POOL_IDLE.set(stats["idle"])
+    # QueuePool counts overflow from -pool_size until the pool is full
+    DB_POOL_OVERFLOW.set(max(stats["overflow"], 0))
+
+
+metrics.register_collector(_collect_pool_metrics)
+
+
+async def warm_pool(connections: int) -> int:
+    """
+    Opens up to `connections` pooled connections (at most pool_size, so
+    none of them is overflow that gets closed on return) so the first
+    requests don't pay for connecting. Returns how many were opened.
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+
+    async def _open():
+        conn = await engine.connect().start()
+        try:
+            await conn.execute(text("SELECT 1"))
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    # Held until all are open, so each checkout gets its own connection
+    results = await asyncio.gather(*(_open() for _ in range(connections)), return_exceptions=True)
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    for conn in opened:
+        await conn.close() # Back to the pool, still connected
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors and not opened:
+        raise errors[0]
+    return len(opened)
+
+
+# --- Statement timing ---
+# Cursor events fire on the sync engine underneath the async one.
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    operation = _operation(statement)
+    DB_QUERY_SECONDS.observe(elapsed, operation=operation)
+    if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+        DB_SLOW_QUERIES.inc(operation=operation)
+        print(f"Slow query ({elapsed * 1000:.0f} ms): {' '.join(statement.split())[:500]}")
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    # Drop the start time of a statement that failed
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_times"):
+        conn.info["query_start_times"].pop()
+
 
 # Create a sessionmaker
 async_session = async_sessionmaker(
@@ -22,4 +197,4 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
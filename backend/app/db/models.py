@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Float, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+from app.core.compression import compress_text, decompress_text
 from app.db.database import Base
 
+RESUME_PREVIEW_CHARS = 500
+
 class User(Base):
     __tablename__ = "users"
     
@@ -12,19 +15,48 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     resumes = relationship("Resume", back_populates="owner")
-    # analyses = relationship("AnalysisHistory", back_populates="user") # For Phase B
+    analyses = relationship("AnalysisHistory", back_populates="user")
 
 class Resume(Base):
     __tablename__ = "resumes"
     
     id = Column(Integer, primary_key=True, index=True)
     original_filename = Column(String, nullable=False)
-    extracted_text = Column(Text, nullable=False)
+    # Compressed full text (see app.core.compression). Deferred: only loaded
+    # when a query asks for it with undefer(), e.g. get_resume_by_id(with_text=True).
+    extracted_text_compressed = deferred(Column(LargeBinary, nullable=False))
+    text_preview = Column(Text, nullable=False, server_default="") # First RESUME_PREVIEW_CHARS chars
+    char_count = Column(Integer, nullable=False, server_default="0")
+    content_sha256 = Column(String(64), nullable=True) # Hex SHA-256 of the uploaded PDF bytes
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     user_id = Column(Integer, ForeignKey("users.id"))
     
     owner = relationship("User", back_populates="resumes")
 
+    @property
+    def extracted_text(self) -> str:
+        return decompress_text(self.extracted_text_compressed)
+
+    @extracted_text.setter
+    def extracted_text(self, text: str) -> None:
+        self.extracted_text_compressed = compress_text(text)
+        self.char_count = len(text)
+        if len(text) > RESUME_PREVIEW_CHARS:
+            self.text_preview = text[:RESUME_PREVIEW_CHARS] + '...'
+        else:
+            self.text_preview = text
+
+    __table_args__ = (
+        # Finds a user's earlier upload of the same file
+        Index("ix_resumes_user_id_content_sha256", "user_id", "content_sha256"),
+        # Covers the paginated history listing (index-only scan, no table access)
+        Index(
+            "ix_resumes_user_id_uploaded_at_id",
+            "user_id", "uploaded_at", "id",
+            postgresql_include=["original_filename", "char_count"]
+        ),
+    )
+
 class TargetRoleProfile(Base):
     __tablename__ = "target_role_profiles"
     
@@ -34,15 +66,52 @@ class TargetRoleProfile(Base):
     top_skills_json = Column(Text, nullable=False) # Storing as JSON string
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     source_job_examples = Column(Text) # Storing list of source URLs as JSON string
+    refresh_started_at = Column(DateTime(timezone=True), nullable=True) # Set while a background refresh is running
+    version = Column(Integer, nullable=False, server_default="1") # Bumped every time the profile is regenerated
 
-# Optional: Phase B/C model
-# class AnalysisHistory(Base):
-#     __tablename__ = "analysis_history"
-#     id = Column(Integer, primary_key=True, index=True)
-#     user_id = Column(Integer, ForeignKey("users.id"))
-#     resume_id = Column(Integer, ForeignKey("resumes.id"))
-#     role_profile_id = Column(Integer, ForeignKey("target_role_profiles.id"))
-#     result_json = Column(Text, nullable=False)
-#     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-#     user = relationship("User", back_populates="analyses")
\ No newline at end of file
+class AnalysisHistory(Base):
+    __tablename__ = "analysis_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    role_profile_id = Column(Integer, ForeignKey("target_role_profiles.id"), nullable=False)
+    role_profile_version = Column(Integer, nullable=False)
+    learning_preference = Column(String, nullable=False)
+    skill_match_score = Column(Float, nullable=False) # Copied out of result_json for listing
+    result_json = Column(Text, nullable=False) # GeminiSkillGapSchema as JSON string
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="analyses")
+
+    __table_args__ = (
+        # Finds an earlier analysis with identical inputs
+        Index(
+            "ix_analysis_history_inputs",
+            "user_id", "resume_id", "role_profile_id", "role_profile_version", "learning_preference"
+        ),
+        Index("ix_analysis_history_user_id_created_at", "user_id", "created_at"),
+    )
+
+class AIJob(Base):
+    __tablename__ = "ai_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False) # "skill_gap" or "optimize"
+    status = Column(String, nullable=False, server_default="queued") # queued, running, succeeded, failed
+    payload_json = Column(Text, nullable=False) # The original request as JSON string
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now()) # Not picked up before this (retry backoff)
+    locked_at = Column(DateTime(timezone=True), nullable=True) # When a worker claimed it
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True) # Finished jobs are deleted after this
+
+    __table_args__ = (
+        # Workers claim the oldest runnable job
+        Index("ix_ai_jobs_status_run_after", "status", "run_after"),
+    )
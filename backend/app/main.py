@@ -1,15 +1,40 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from typing import Any, MutableMapping
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api import auth
+from app.api import jobs
 from app.api import resume
 from app.api import role
 from app.api import skill_gap
+from app.core import metrics, security
+from app.core.config import settings
+from app.core.http_client import close_http_client
+from app.services import job_queue_service, resume_service, warmup_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: background workers for queued AI jobs, and warm-up (in the
+    # background, so the server starts listening right away; see /ready)
+    if settings.JOB_WORKERS > 0:
+        job_queue_service.start_workers()
+    warmup_service.start_warmup()
+    yield
+    # Shutdown: stop background workers and pools
+    await warmup_service.stop_warmup()
+    await job_queue_service.stop_workers()
+    resume_service.shutdown_pdf_executor()
+    security.shutdown_hash_executor()
+    await close_http_client()
 
 app = FastAPI(
     title="SkillSync AI API",
     description="Analyzes resumes against job roles and builds learning roadmaps.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -27,6 +52,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds",
+    "Time to produce a response (streaming bodies excluded), per route.",
+    labelnames=("endpoint", "method", "status")
+)
+
+
+def _route_template(scope: MutableMapping[str, Any]) -> str:
+    """
+    The path template of the route that handled the request, e.g.
+    /skill-gap/history/{analysis_id}, or "other" if none matched. Only
+    known once the request has been routed.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "other"
+    # A route of an included router keeps its path without the router's
+    # prefix (/history/{analysis_id}); FastAPI records the full template
+    # in its route context
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path_format", None) or route.path_format
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # Services label their stage metrics with the route, resolved when
+    # they record them (routing happens inside call_next)
+    token = metrics.set_endpoint(lambda: _route_template(request.scope))
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=_route_template(request.scope),
+            method=request.method,
+            status=str(status_code)
+        )
+        metrics.reset_endpoint(token)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint (this worker's metrics only)."""
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/ready", include_in_schema=False)
+async def get_readiness():
+    """
+    Readiness probe: 503 until startup warm-up has finished, so traffic is
+    only routed to warm instances. "/" stays the liveness check.
+    """
+    status = warmup_service.get_warmup_status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Welcome to the SkillSync AI API!"}
@@ -42,4 +128,6 @@ app.include_router(resume.router, prefix="/resume", tags=["Resumes"])
 
 app.include_router(role.router, prefix="/role", tags=["Role Analysis"])
 
-app.include_router(skill_gap.router, prefix="/skill-gap", tags=["Skill Gap"])
\ No newline at end of file
+app.include_router(skill_gap.router, prefix="/skill-gap", tags=["Skill Gap"])
+
+app.include_router(jobs.router, prefix="/jobs", tags=["Background Jobs"])
\ No newline at end of file
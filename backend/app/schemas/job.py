@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Literal
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+class JobSubmitResponse(BaseModel):
+    job_id: int
+    status: JobStatus
+
+class JobStatusResponse(BaseModel):
+    """
+    Schema for polling a background job. `result` is set once the job
+    has succeeded, with the same shape the synchronous endpoint returns.
+    """
+    job_id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    created_at: datetime
+    finished_at: datetime | None = None
+    result: Any | None = None
+    error: str | None = None
@@ -1,11 +1,13 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List
 
 class ResumeBase(BaseModel):
     original_filename: str
     
 class ResumeCreate(ResumeBase):
     extracted_text: str
+    content_sha256: str | None = None
 
 class Resume(ResumeBase):
     id: int
@@ -35,6 +37,15 @@ class ResumeInfo(BaseModel):
     id: int
     original_filename: str
     uploaded_at: datetime
+    char_count: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ResumeHistoryPage(BaseModel):
+    """
+    One page of the resume history, newest first. Pass `next_cursor`
+    back as `cursor` to get the next page; it's null on the last page.
+    """
+    items: List[ResumeInfo]
+    next_cursor: str | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Literal
 
 # --- For the API Request ---
@@ -8,6 +9,11 @@ class SkillGapRequest(BaseModel):
     role_name: str
     learning_preference: Literal["Coding Projects", "Video Courses", "Reading / Docs"] = "Coding Projects"
 
+class SkillGapBatchRequest(BaseModel):
+    resume_id: int
+    role_names: List[str] = Field(min_length=1, max_length=5)
+    learning_preference: Literal["Coding Projects", "Video Courses", "Reading / Docs"] = "Coding Projects"
+
 # --- For the Gemini JSON Response ---
 # We define the structure we want the AI to return.
 
@@ -44,6 +50,57 @@ class GeminiSkillGapSchema(BaseModel):
         description="A detailed list comparing the resume against the target skills."
     )
 
+class SkillMatchPreview(BaseModel):
+    """
+    Instant local estimate, computed without calling the AI.
+    """
+    skill_match_score: float = Field(
+        description=(
+            "Technical skills only: share (0.0-100.0) of the role's technical "
+            "skills found verbatim in the resume. Soft skills can't be matched "
+            "locally and don't count towards it."
+        )
+    )
+    matched_skills: List[str]
+    unresolved_skills: List[str] = Field(
+        description=(
+            "Technical skills not found verbatim, then all soft skills; "
+            "these need the full analysis."
+        )
+    )
+
 # --- For the API Response ---
 # Our API will return the exact structure it gets from Gemini.
-# So, we can just reuse the GeminiSkillGapSchema as our response_model.
\ No newline at end of file
+# So, we can just reuse the GeminiSkillGapSchema as our response_model.
+
+class SkillGapBatchItem(BaseModel):
+    """
+    The outcome for one role of a batch: either a result or an error.
+    """
+    role_name: str
+    result: GeminiSkillGapSchema | None = None
+    error: str | None = None
+
+class SkillGapBatchResponse(BaseModel):
+    resume_id: int
+    results: List[SkillGapBatchItem]
+
+# --- For the Analysis History API ---
+
+class AnalysisHistoryInfo(BaseModel):
+    """
+    Schema for displaying a list of past analyses.
+    """
+    id: int
+    resume_id: int
+    role_name: str
+    role_profile_version: int
+    learning_preference: str
+    skill_match_score: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnalysisHistoryDetail(AnalysisHistoryInfo):
+    result: GeminiSkillGapSchema
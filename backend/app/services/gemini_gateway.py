@@ -0,0 +1,301 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.http_client import get_http_client
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+# All Gemini calls go through this module. It imports and configures the
+# SDK on first use (the import alone is most of the app's startup time),
+# reuses one model object per generation config, and bounds how many
+# calls are in flight (globally and per endpoint) so bursts queue up to
+# a limit instead of blowing through the quota.
+
+GEMINI_MODEL_NAME = 'gemini-2.5-flash'
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+GEMINI_IN_FLIGHT = metrics.gauge(
+    "gemini_in_flight",
+    "Gemini calls currently running.",
+    labelnames=("endpoint",)
+)
+GEMINI_QUEUE_DEPTH = metrics.gauge(
+    "gemini_queue_depth",
+    "Gemini calls waiting for a free slot.",
+    labelnames=("endpoint",)
+)
+GEMINI_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "gemini_queue_wait_seconds",
+    "Time spent waiting for a free Gemini slot.",
+    labelnames=("endpoint",)
+)
+GEMINI_REJECTED = metrics.counter(
+    "gemini_rejected_total",
+    "Gemini calls rejected before reaching the API.",
+    labelnames=("endpoint", "reason")
+)
+
+
+class GeminiOverloaded(Exception):
+    """Raised when a Gemini call can't get a slot (queue full or wait timed out)."""
+
+
+_configured = False
+_models: Dict[str, "genai.GenerativeModel"] = {}
+
+_global_slots = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+_endpoint_slots: Dict[str, asyncio.Semaphore] = {}
+_in_flight: Dict[str, int] = {}
+_waiting: Dict[str, int] = {}
+
+
+def get_model(json_mode: bool = False) -> "genai.GenerativeModel":
+    """
+    Returns the shared model object for a generation config, importing and
+    configuring the SDK on first use.
+    """
+    import google.generativeai as genai
+
+    global _configured
+    if not _configured:
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        _configured = True
+
+    key = "json" if json_mode else "text"
+    model = _models.get(key)
+    if model is None:
+        model = genai.GenerativeModel(
+            GEMINI_MODEL_NAME,
+            generation_config=JSON_GENERATION_CONFIG if json_mode else None
+        )
+        _models[key] = model
+    return model
+
+
+def warmup_urls() -> List[str]:
+    """
+    URLs to open connections to ahead of the first call. Only the REST
+    transport uses the shared HTTP client; the SDK has its own channel.
+    """
+    if settings.GEMINI_TRANSPORT == "rest":
+        return [settings.GEMINI_API_BASE_URL]
+    return []
+
+
+def warm_models() -> None:
+    """Imports the SDK and builds both model objects (blocking; run it in a thread)."""
+    if settings.GEMINI_TRANSPORT != "rest":
+        get_model(json_mode=False)
+        get_model(json_mode=True)
+
+
+def _get_endpoint_slots(endpoint: str) -> asyncio.Semaphore:
+    slots = _endpoint_slots.get(endpoint)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.GEMINI_ENDPOINT_MAX_CONCURRENCY)
+        _endpoint_slots[endpoint] = slots
+    return slots
+
+
+@asynccontextmanager
+async def _slot(endpoint: str):
+    """
+    Holds one endpoint slot and one global slot for the duration of a call.
+    Raises GeminiOverloaded if too many calls are already waiting, or if no
+    slot frees up within GEMINI_QUEUE_TIMEOUT_SECONDS.
+    """
+    total_waiting = sum(_waiting.values())
+    if total_waiting >= settings.GEMINI_MAX_QUEUE:
+        GEMINI_REJECTED.inc(endpoint=endpoint, reason="queue_full")
+        raise GeminiOverloaded("The AI service is busy. Please try again shortly.")
+
+    endpoint_slots = _get_endpoint_slots(endpoint)
+    holding_endpoint = False
+    holding_global = False
+
+    _waiting[endpoint] = _waiting.get(endpoint, 0) + 1
+    GEMINI_QUEUE_DEPTH.set(_waiting[endpoint], endpoint=endpoint)
+    wait_start = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.GEMINI_QUEUE_TIMEOUT_SECONDS):
+            await endpoint_slots.acquire()
+            holding_endpoint = True
+            await _global_slots.acquire()
+            holding_global = True
+    except TimeoutError:
+        if holding_endpoint:
+            endpoint_slots.release()
+        GEMINI_REJECTED.inc(endpoint=endpoint, reason="queue_timeout")
+        raise GeminiOverloaded("The AI service is busy. Please try again shortly.")
+    except BaseException:
+        # Cancelled while waiting
+        if holding_global:
+            _global_slots.release()
+        if holding_endpoint:
+            endpoint_slots.release()
+        raise
+    finally:
+        _waiting[endpoint] -= 1
+        GEMINI_QUEUE_DEPTH.set(_waiting[endpoint], endpoint=endpoint)
+        GEMINI_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - wait_start, endpoint=endpoint)
+
+    _in_flight[endpoint] = _in_flight.get(endpoint, 0) + 1
+    GEMINI_IN_FLIGHT.set(_in_flight[endpoint], endpoint=endpoint)
+    try:
+        yield
+    finally:
+        _in_flight[endpoint] -= 1
+        GEMINI_IN_FLIGHT.set(_in_flight[endpoint], endpoint=endpoint)
+        _global_slots.release()
+        endpoint_slots.release()
+
+
+# --- REST transport (GEMINI_TRANSPORT="rest") ---
+# Same API as the SDK, called with the shared HTTP client.
+
+def _rest_url(method: str) -> str:
+    return f"{settings.GEMINI_API_BASE_URL.rstrip('/')}/v1beta/models/{GEMINI_MODEL_NAME}:{method}"
+
+
+def _rest_request(prompt: str, json_mode: bool) -> Dict[str, Any]:
+    body: Dict[str, Any] = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    if json_mode:
+        body["generationConfig"] = {"responseMimeType": "application/json"}
+    return body
+
+
+def _rest_response_text(payload: Dict[str, Any]) -> str:
+    """Joins the text parts of the first candidate."""
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+async def _rest_generate(prompt: str, json_mode: bool) -> str:
+    response = await get_http_client().post(
+        _rest_url("generateContent"),
+        headers={"x-goog-api-key": settings.GOOGLE_API_KEY},
+        json=_rest_request(prompt, json_mode),
+        timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+    )
+    response.raise_for_status()
+    text = _rest_response_text(response.json())
+    if not text:
+        raise ValueError("Gemini returned no text.")
+    return text
+
+
+async def _rest_stream(prompt: str) -> AsyncIterator[str]:
+    async with get_http_client().stream(
+        "POST",
+        _rest_url("streamGenerateContent"),
+        params={"alt": "sse"},
+        headers={"x-goog-api-key": settings.GOOGLE_API_KEY},
+        json=_rest_request(prompt, json_mode=False),
+        timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            text = _rest_response_text(json.loads(line[len("data:"):]))
+            if text:
+                yield text
+
+
+async def generate(endpoint: str, prompt: str, json_mode: bool = False) -> str:
+    """
+    Runs one Gemini generation and returns the response text.
+    endpoint names the caller (e.g. "skill_gap") for limits and metrics.
+    """
+    async with _slot(endpoint):
+        if settings.GEMINI_TRANSPORT == "rest":
+            return await asyncio.wait_for(
+                _rest_generate(prompt, json_mode),
+                timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+            )
+        response = await asyncio.wait_for(
+            get_model(json_mode).generate_content_async(prompt),
+            timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+        )
+        return response.text
+
+
+async def _sdk_stream(prompt: str) -> AsyncIterator[str]:
+    response = await get_model().generate_content_async(prompt, stream=True)
+    async for chunk in response:
+        # Chunks without text (e.g. only safety metadata) are skipped
+        if chunk.parts:
+            yield chunk.text
+
+
+_STREAM_END = object()
+
+
+async def _pump_stream(chunks: AsyncIterator[str], queue: asyncio.Queue) -> None:
+    """Reads a stream into a queue, ending with _STREAM_END or the error."""
+    try:
+        async for text_chunk in chunks:
+            queue.put_nowait(text_chunk)
+        queue.put_nowait(_STREAM_END)
+    except Exception as e:
+        queue.put_nowait(e)
+    finally:
+        await chunks.aclose()
+
+
+async def stream(endpoint: str, prompt: str) -> AsyncIterator[str]:
+    """
+    Runs one streaming Gemini generation, yielding text as it arrives.
+    The slot is held until the stream finishes or the generator is closed.
+
+    The response is read by a separate task, which is cancelled when the
+    generator is closed (e.g. the client disconnected) or the whole stream
+    runs past GEMINI_REQUEST_TIMEOUT_SECONDS (raising TimeoutError).
+    Closing the SDK's response iterator doesn't end the call, but
+    cancelling a pending read does (gRPC cancels the RPC, httpx closes the
+    connection), so an abandoned generation stops using tokens.
+    """
+    async with _slot(endpoint):
+        if settings.GEMINI_TRANSPORT == "rest":
+            chunks = _rest_stream(prompt)
+        else:
+            chunks = _sdk_stream(prompt)
+
+        # Unbounded, so the reader is always waiting on the API (where
+        # cancelling it ends the call), never on us
+        queue: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.create_task(_pump_stream(chunks, queue))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """Returns calls in flight and waiting, per endpoint."""
+    endpoints = sorted(set(_in_flight) | set(_waiting))
+    return {
+        endpoint: {
+            "in_flight": _in_flight.get(endpoint, 0),
+            "waiting": _waiting.get(endpoint, 0),
+        }
+        for endpoint in endpoints
+    }
@@ -0,0 +1,249 @@
+import hashlib
+import html
+import random
+import re
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, List
+
+from app.core.config import settings
+
+# Cleans raw job board descriptions before they go into the role-profile
+# prompt. Each stage is a generator, so descriptions flow through one at
+# a time:
+#
+#   HTML -> plain text -> boilerplate removed -> near-duplicates dropped
+#
+# and the survivors are then trimmed to fit a token budget.
+
+# --- 1. HTML to text ---
+
+# Tags that start a new line of text
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "blockquote",
+}
+# Tags whose content is never visible text
+_SKIPPED_TAGS = {"script", "style", "noscript", "head", "title"}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML fragment, one line per block."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "li":
+            self.parts.append("- ")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(fragment: str) -> str:
+    """Converts an HTML fragment to plain text, one line per block."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(fragment)
+        parser.close()
+        text = "".join(parser.parts)
+    except Exception:
+        # Badly broken markup: fall back to dropping anything tag-like
+        text = html.unescape(re.sub(r"<[^>]+>", " ", fragment))
+
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _to_text(descriptions: Iterable[str]) -> Iterator[str]:
+    for description in descriptions:
+        yield html_to_text(description)
+
+# --- 2. Boilerplate removal ---
+
+# Lines that say nothing about the role itself (application instructions,
+# legal notices, company sign-offs). Arbeitnow postings are often German.
+_BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\bequal (employment )?opportunit",
+        r"\b(apply|bewirb dich) (now|today|jetzt)\b",
+        r"\bclick (here|the button)\b",
+        r"\blook(ing)? forward to (receiving )?your application\b",
+        r"\bwir freuen uns auf (deine|ihre) bewerbung\b",
+        # Legal and cookie-banner text only: requirement lines mention these
+        # too ("GDPR / data protection experience", "HTTP cookies/sessions")
+        r"\bprivacy (policy|notice|statement)\b",
+        r"\b(data protection|datenschutz) ?(notice|information|policy|declaration|erklärung|hinweise?)\b",
+        r"\b(information|hinweise) (on|about|zum) (data protection|datenschutz)\b",
+        r"^\W*(data protection|datenschutz|privacy|cookies?)\W*$",
+        r"\b(we|this (web)?site) uses? cookies\b",
+        r"\b(accept|allow|manage) (all )?cookies\b",
+        r"\bcookie (policy|settings|consent|preferences)\b",
+        r"\bregardless of (gender|age|race|origin)\b",
+        r"\bunabhängig von (geschlecht|alter|herkunft)\b",
+        r"\bfollow us on\b",
+    )
+]
+# German gender tags ("Python Developer (m/w/d)"). Only the tag is removed:
+# the rest of the line is usually the role and its requirements.
+_GENDER_TAG = re.compile(r"\(?\b[mwfd]/[mwfd]/[mwfd]\b\)?", re.IGNORECASE)
+_MIN_LINE_LENGTH = 3
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drops boilerplate lines and lines repeated within the same posting."""
+    kept: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        line = " ".join(_GENDER_TAG.sub("", line).split())
+        key = line.lower()
+        if len(line) < _MIN_LINE_LENGTH or key in seen:
+            continue
+        if any(pattern.search(line) for pattern in _BOILERPLATE_PATTERNS):
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _strip_boilerplate(texts: Iterable[str]) -> Iterator[str]:
+    for text in texts:
+        cleaned = strip_boilerplate(text)
+        if cleaned:
+            yield cleaned
+
+# --- 3. Near-duplicate removal (word shingles + MinHash) ---
+
+SHINGLE_SIZE = 5 # Words per shingle
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed, so signatures are comparable across calls and processes
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    Returns the MinHash signature of a text's word shingles. The share of
+    equal positions between two signatures estimates their Jaccard similarity.
+    """
+    base_hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in _shingles(text)
+    ]
+    if not base_hashes:
+        return [_MAX_HASH] * MINHASH_PERMUTATIONS
+
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in base_hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimated_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    equal = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return equal / MINHASH_PERMUTATIONS
+
+
+def _drop_near_duplicates(texts: Iterable[str], threshold: float) -> Iterator[str]:
+    # Job lists are small (tens of postings), so comparing each posting to
+    # the ones kept so far is cheaper than setting up LSH buckets.
+    kept_signatures: List[List[int]] = []
+    for text in texts:
+        signature = minhash_signature(text)
+        if any(estimated_similarity(signature, kept) >= threshold for kept in kept_signatures):
+            continue
+        kept_signatures.append(signature)
+        yield text
+
+# --- 4. Token budget ---
+
+CHARS_PER_TOKEN = 4 # Rough average for English/German prose
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting a prompt."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip()
+
+
+def trim_to_token_budget(texts: List[str], budget: int) -> List[str]:
+    """
+    Shares a token budget fairly between texts: short ones are kept whole
+    and the remaining budget is split among the longer ones, which are cut
+    at a word boundary. Order is preserved.
+    """
+    if not texts:
+        return []
+
+    allowance = [0] * len(texts)
+    remaining_budget = budget
+    # Hand out the budget shortest-first, so unused shares flow to longer texts
+    by_length = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    for position, index in enumerate(by_length):
+        fair_share = remaining_budget // (len(texts) - position)
+        allowance[index] = min(estimate_tokens(texts[index]), fair_share)
+        remaining_budget -= allowance[index]
+
+    trimmed = (
+        _truncate_to_tokens(text, tokens)
+        for text, tokens in zip(texts, allowance)
+    )
+    return [text for text in trimmed if text]
+
+# --- Pipeline ---
+
+def preprocess_job_descriptions(
+    descriptions: Iterable[str],
+    token_budget: int | None = None,
+    similarity_threshold: float | None = None
+) -> List[str]:
+    """
+    Turns raw job board descriptions into clean, de-duplicated plain text
+    that fits in token_budget (defaults to JOB_PROMPT_TOKEN_BUDGET).
+    """
+    if token_budget is None:
+        token_budget = settings.JOB_PROMPT_TOKEN_BUDGET
+    if similarity_threshold is None:
+        similarity_threshold = settings.JOB_NEAR_DUPLICATE_THRESHOLD
+
+    texts = _to_text(descriptions)
+    texts = _strip_boilerplate(texts)
+    texts = _drop_near_duplicates(texts, similarity_threshold)
+    return trim_to_token_budget(list(texts), token_budget)
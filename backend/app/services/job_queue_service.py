@@ -0,0 +1,312 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Any, Dict, List
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import async_session
+from app.db.models import AIJob, User
+from app.schemas.job import JobStatusResponse
+from app.services import resume_service, role_service, skill_gap_service
+
+# A small job queue on top of Postgres. The API inserts a row and returns
+# right away; in-process workers claim rows with
+# SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers (across any
+# number of instances) can poll the same table without taking the same job.
+
+JOB_KINDS = ("skill_gap", "optimize")
+PURGE_EVERY_POLLS = 60 # How often (in idle polls) a worker deletes expired jobs
+
+# --- 1. API side: submit and poll ---
+
+async def enqueue_job(
+    db: AsyncSession,
+    user: User,
+    kind: str,
+    payload: Dict[str, Any]
+) -> AIJob:
+    """
+    Queues a job for the workers.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    db_job = AIJob(
+        user_id=user.id,
+        kind=kind,
+        status="queued",
+        payload_json=json.dumps(payload),
+        max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def get_job(db: AsyncSession, user: User, job_id: int) -> JobStatusResponse | None:
+    """
+    Fetches a job's status (and result, once done), ensuring it belongs
+    to the current user.
+    """
+    result = await db.execute(
+        select(AIJob).filter(AIJob.id == job_id, AIJob.user_id == user.id)
+    )
+    job = result.scalars().first()
+    if job is None:
+        return None
+
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=json.loads(job.result_json) if job.result_json else None,
+        # Errors of attempts that will be retried aren't final
+        error=job.error if job.status == "failed" else None
+    )
+
+# --- 2. Worker side: claim, run, record ---
+
+async def claim_next_job() -> AIJob | None:
+    """
+    Claims the oldest runnable job: a queued job whose backoff has passed,
+    or a running job whose worker seems to have died and that has attempts
+    left. Abandoned jobs without attempts left (e.g. one that keeps
+    crashing its worker) are marked failed instead.
+
+    The claim's locked_at identifies this worker's claim: the job's result
+    is only recorded while the row still carries it.
+    """
+    now = datetime.now(timezone.utc)
+    abandoned_cutoff = now - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+
+    async with async_session() as db:
+        await db.execute(
+            update(AIJob)
+            .where(
+                AIJob.status == "running",
+                AIJob.locked_at < abandoned_cutoff,
+                AIJob.attempts >= AIJob.max_attempts
+            )
+            .values(
+                status="failed",
+                error="The job did not finish in time on its last attempt.",
+                finished_at=now,
+                expires_at=now + timedelta(hours=settings.JOB_RESULT_TTL_HOURS)
+            )
+        )
+
+        result = await db.execute(
+            select(AIJob)
+            .filter(or_(
+                and_(AIJob.status == "queued", AIJob.run_after <= now),
+                and_(
+                    AIJob.status == "running",
+                    AIJob.locked_at < abandoned_cutoff,
+                    AIJob.attempts < AIJob.max_attempts
+                )
+            ))
+            .order_by(AIJob.run_after, AIJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalars().first()
+        if job is None:
+            await db.commit() # Keep the jobs failed above
+            return None
+
+        job.status = "running"
+        job.locked_at = now
+        job.attempts = job.attempts + 1
+        await db.commit()
+        return job
+
+async def _run_skill_gap_job(user: User, payload: Dict[str, Any]) -> Any:
+    async with async_session() as db:
+        resume = await skill_gap_service.get_resume_by_id(db, resume_id=payload["resume_id"], user=user)
+        if not resume:
+            raise LookupError("Resume not found or does not belong to user.")
+        role_profile = await role_service.get_or_create_role_profile(db, role_name=payload["role_name"])
+
+        saved_analysis = await skill_gap_service.get_saved_analysis(
+            db,
+            user=user,
+            resume_id=resume.id,
+            role_profile=role_profile,
+            learning_preference=payload["learning_preference"]
+        )
+        if saved_analysis:
+            return saved_analysis.model_dump(mode="json")
+        await skill_gap_service.load_resume_text(db, resume)
+
+    # No session is held during the Gemini call
+    analysis_result = await skill_gap_service.generate_skill_gap_analysis(
+        resume_text=resume.extracted_text,
+        role_profile=role_profile,
+        learning_preference=payload["learning_preference"]
+    )
+
+    async with async_session() as db:
+        await skill_gap_service.save_analysis(
+            db,
+            user=user,
+            resume_id=resume.id,
+            role_profile=role_profile,
+            learning_preference=payload["learning_preference"],
+            analysis=analysis_result
+        )
+    return analysis_result.model_dump(mode="json")
+
+async def _run_optimize_job(user: User, payload: Dict[str, Any]) -> Any:
+    async with async_session() as db:
+        resume = await skill_gap_service.get_resume_by_id(db, resume_id=payload["resume_id"], user=user, with_text=True)
+        if not resume:
+            raise LookupError("Resume not found.")
+        role_profile = await role_service.get_or_create_role_profile(db, role_name=payload["role_name"])
+
+    optimized_text = await resume_service.generate_optimized_resume(
+        resume_text=resume.extracted_text,
+        role_profile=role_profile
+    )
+    if optimized_text.startswith("Error:"):
+        raise Exception(optimized_text)
+    return {"optimized_resume_text": optimized_text}
+
+async def run_job(job: AIJob) -> None:
+    """
+    Runs a claimed job and records its result, or schedules a retry with
+    exponential backoff until max_attempts is reached.
+    """
+    # Label this job's pipeline metrics with its kind, and only this job's:
+    # the worker's polling between jobs runs on the same task
+    token = metrics.set_endpoint(f"job:{job.kind}")
+    try:
+        await _run_job(job)
+    finally:
+        metrics.reset_endpoint(token)
+
+async def _run_job(job: AIJob) -> None:
+    try:
+        async with async_session() as db:
+            user = await db.get(User, job.user_id)
+        if user is None:
+            raise LookupError("User not found.")
+
+        payload = json.loads(job.payload_json)
+        if job.kind == "skill_gap":
+            result = await _run_skill_gap_job(user, payload)
+        elif job.kind == "optimize":
+            result = await _run_optimize_job(user, payload)
+        else:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+    except Exception as e:
+        print(f"Error running job {job.id} ({job.kind}, attempt {job.attempts}): {e}")
+        await _record_failure(job, str(e), retry=not isinstance(e, LookupError))
+        return
+
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        db_job = await _get_owned_job(db, job)
+        if db_job is None:
+            return
+        db_job.status = "succeeded"
+        db_job.result_json = json.dumps(result)
+        db_job.error = None
+        db_job.finished_at = now
+        db_job.expires_at = now + timedelta(hours=settings.JOB_RESULT_TTL_HOURS)
+        await db.commit()
+
+async def _get_owned_job(db: AsyncSession, job: AIJob) -> AIJob | None:
+    """
+    Locks and returns the job's row if it still belongs to this worker's
+    claim. Returns None if it was deleted, or if it ran past the
+    visibility timeout and another worker reclaimed it (or it was failed),
+    so a late finish can't overwrite the newer attempt's outcome.
+    """
+    db_job = await db.get(AIJob, job.id, with_for_update=True)
+    if db_job is None:
+        return None
+    if db_job.status != "running" or db_job.locked_at != job.locked_at:
+        print(f"Job {job.id} is no longer claimed by this worker; dropping its outcome.")
+        return None
+    return db_job
+
+async def _record_failure(job: AIJob, error: str, retry: bool) -> None:
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        db_job = await _get_owned_job(db, job)
+        if db_job is None:
+            return
+
+        db_job.error = error
+        if retry and db_job.attempts < db_job.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (db_job.attempts - 1))
+            db_job.status = "queued"
+            db_job.run_after = now + timedelta(seconds=backoff)
+            db_job.locked_at = None
+        else:
+            db_job.status = "failed"
+            db_job.finished_at = now
+            db_job.expires_at = now + timedelta(hours=settings.JOB_RESULT_TTL_HOURS)
+        await db.commit()
+
+async def purge_expired_jobs() -> int:
+    """Deletes finished jobs whose results have expired."""
+    async with async_session() as db:
+        result = await db.execute(
+            delete(AIJob).where(AIJob.expires_at < datetime.now(timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount
+
+# --- 3. Worker lifecycle ---
+
+_workers: List[asyncio.Task] = []
+_stopping = asyncio.Event()
+
+async def _worker_loop(worker_number: int) -> None:
+    idle_polls = 0
+    while not _stopping.is_set():
+        try:
+            job = await claim_next_job()
+            if job is not None:
+                idle_polls = 0
+                await run_job(job)
+                continue
+
+            idle_polls += 1
+            if worker_number == 0 and idle_polls % PURGE_EVERY_POLLS == 0:
+                await purge_expired_jobs()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # e.g. the database is briefly unreachable; keep polling
+            print(f"Job worker {worker_number} error: {e}")
+
+        try:
+            await asyncio.wait_for(_stopping.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+def start_workers() -> None:
+    """Starts JOB_WORKERS worker tasks on the running event loop."""
+    _stopping.clear()
+    for worker_number in range(settings.JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(worker_number)))
+
+async def stop_workers() -> None:
+    """
+    Stops the workers. A job cut off mid-run stays 'running' and is picked
+    up again once JOB_VISIBILITY_TIMEOUT_SECONDS passes.
+    """
+    _stopping.set()
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -1,24 +1,138 @@
+import asyncio
+import base64
+import hashlib
 import io
-import google.generativeai as genai
+import multiprocessing
+import os
+import tempfile
+from contextlib import aclosing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import UploadFile
+from app.core import metrics
 from app.core.config import settings
-from PyPDF2 import PdfReader
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from sqlalchemy import tuple_
+from typing import AsyncIterator, List, Tuple
 from app.db.models import Resume, User, TargetRoleProfile
-from app.schemas.resume import ResumeCreate
+from app.schemas.resume import ResumeCreate, ResumeInfo
+from app.services import gemini_gateway
 from sqlalchemy.future import select
 
-def extract_text_from_pdf(pdf_file: io.BytesIO) -> str:
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class ExtractionPoolSaturated(Exception):
+    """Raised when no PDF extraction slot frees up in time."""
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload goes past MAX_UPLOAD_BYTES."""
+
+
+class SpooledUpload:
+    """
+    An uploaded file, held in memory while small and in a temp file on
+    disk once it passes the spool threshold.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.data: bytes | None = None
+        self.path: str | None = None
+        self.sha256: str | None = None # Hex digest, set once fully read
+
+    @property
+    def source(self) -> bytes | str:
+        """The in-memory bytes, or the temp file's path if spooled."""
+        return self.path if self.path is not None else self.data
+
+    def close(self) -> None:
+        """Deletes the temp file, if any."""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    spool_threshold: int
+) -> SpooledUpload:
+    """
+    Copies an upload chunk by chunk, enforcing max_bytes as the chunks
+    arrive. Memory use is bounded by spool_threshold whatever the file size.
+    The content's SHA-256 is computed along the way.
+    """
+    upload = SpooledUpload()
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    disk_file = None
+
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            upload.size += len(chunk)
+            if upload.size > max_bytes:
+                raise UploadTooLarge(
+                    f"The file is too large (maximum is {max_bytes // (1024 * 1024)} MB)."
+                )
+            digest.update(chunk)
+
+            if disk_file is None and upload.size > spool_threshold:
+                # Past the threshold: move what we have so far to disk
+                disk_file = tempfile.NamedTemporaryFile(
+                    prefix="resume-", suffix=".pdf", delete=False
+                )
+                upload.path = disk_file.name
+                disk_file.writelines(chunks)
+                chunks.clear()
+
+            if disk_file is not None:
+                disk_file.write(chunk)
+            else:
+                chunks.append(chunk)
+    except BaseException:
+        if disk_file is not None:
+            disk_file.close()
+        upload.close()
+        raise
+
+    if disk_file is not None:
+        disk_file.close()
+    else:
+        upload.data = b"".join(chunks)
+    upload.sha256 = digest.hexdigest()
+    return upload
+
+
+def extract_text_from_pdf(pdf_file: io.BufferedIOBase, max_pages: int | None = None) -> str:
     """
     Extracts text content from a PDF file.
     """
+    # Imported here so only the extraction workers pay for it
+    from PyPDF2 import PdfReader
+
     try:
         pdf_reader = PdfReader(pdf_file)
-        text = ""
+
+        if max_pages is not None and len(pdf_reader.pages) > max_pages:
+            return f"Error: The PDF has too many pages (maximum is {max_pages})."
+
+        page_texts = []
         for page in pdf_reader.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
+                page_texts.append(page_text + "\n")
+        text = "".join(page_texts)
         
         if not text:
             # Fallback for scanned/image-based PDFs
@@ -29,6 +143,159 @@ def extract_text_from_pdf(pdf_file: io.BytesIO) -> str:
         # Handle potential PyPDF2 errors
         return f"Error: Failed to process PDF file. {str(e)}"
 
+
+def _extract_text_in_worker(source: bytes | str, max_pages: int) -> str:
+    """
+    Entry point run inside the extraction pool's worker processes.
+    source is either the PDF's bytes or the path of a spooled upload.
+    """
+    if isinstance(source, str):
+        # Let PyPDF2 read the spooled file directly instead of loading it
+        with open(source, "rb") as pdf_file:
+            return extract_text_from_pdf(pdf_file, max_pages=max_pages)
+    return extract_text_from_pdf(io.BytesIO(source), max_pages=max_pages)
+
+
+# --- PDF extraction pool ---
+# PyPDF2 is pure-Python and CPU-bound, so it runs in worker processes to
+# keep the event loop free for other requests.
+
+_pdf_executor: ProcessPoolExecutor | None = None
+_pdf_slots = asyncio.Semaphore(settings.PDF_EXTRACT_MAX_CONCURRENCY)
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Returns the extraction pool, creating it on first use."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_EXTRACT_WORKERS,
+            # Forking a process that runs an event loop and threads is unsafe
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_executor
+
+
+def _drop_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Shuts down a (usually broken) pool and, if it's still the current one,
+    forgets it so the next upload starts a fresh one. Another request may
+    already have replaced it, and that newer pool must be left alone.
+    """
+    global _pdf_executor
+    if _pdf_executor is executor:
+        _pdf_executor = None
+    # Not cancel_futures: other uploads' queued jobs get BrokenProcessPool
+    # (a "try again" error) rather than being cancelled under them
+    executor.shutdown(wait=False)
+
+
+def _recycle_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Kills an extraction pool's workers and drops the pool, so the next
+    upload starts a fresh one. The pool can't tell which worker runs which
+    job, so this is the only way to stop one that's over its time limit.
+    Other jobs still in the old pool fail with BrokenProcessPool (and
+    release their slots) instead of waiting behind it.
+    """
+    # ProcessPoolExecutor has no public way to reach its processes
+    for process in list((executor._processes or {}).values()):
+        process.kill()
+    _drop_pdf_executor(executor)
+
+
+def shutdown_pdf_executor() -> None:
+    """Stops the extraction pool's worker processes."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+
+async def extract_text_from_pdf_async(source: bytes | str) -> str:
+    """
+    Runs extract_text_from_pdf in the extraction pool. source is either the
+    PDF's bytes or the path of a file the workers can open.
+
+    Raises ExtractionPoolSaturated if no slot frees up within
+    PDF_EXTRACT_QUEUE_TIMEOUT_SECONDS. Like extract_text_from_pdf, other
+    failures are returned as a string starting with "Error:".
+    """
+    with metrics.stage("pdf_extract", "queue_wait") as timer:
+        try:
+            await asyncio.wait_for(
+                _pdf_slots.acquire(), timeout=settings.PDF_EXTRACT_QUEUE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            timer.outcome = "rejected"
+            raise ExtractionPoolSaturated("The PDF processing queue is full. Please try again shortly.")
+
+    loop = asyncio.get_running_loop()
+    try:
+        executor = _get_pdf_executor()
+        job = executor.submit(
+            _extract_text_in_worker, source, settings.PDF_MAX_PAGES
+        )
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next upload gets a fresh one
+        _pdf_slots.release()
+        _drop_pdf_executor(executor)
+        return "Error: Failed to process PDF file. Please try again."
+    except Exception:
+        _pdf_slots.release()
+        raise
+
+    # The slot is held until the worker is actually done (or killed), so a
+    # slow PDF can't let the pool's backlog grow.
+    def _release_slot(_) -> None:
+        try:
+            loop.call_soon_threadsafe(_pdf_slots.release)
+        except RuntimeError:
+            pass # The event loop is already closed (shutdown)
+
+    job.add_done_callback(_release_slot)
+
+    with metrics.stage("pdf_extract", "extract") as timer:
+        try:
+            text = await asyncio.wait_for(
+                asyncio.wrap_future(job), timeout=settings.PDF_EXTRACT_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            timer.outcome = "timeout"
+            if not job.done():
+                # Stop the work itself, not just the wait for it
+                _recycle_pdf_executor(executor)
+            return "Error: Timed out while processing the PDF file."
+        except BrokenProcessPool:
+            timer.outcome = "error"
+            _drop_pdf_executor(executor)
+            return "Error: Failed to process PDF file. Please try again."
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise # This request itself is being cancelled
+            # The job was cancelled from outside (e.g. the pool shut down)
+            timer.outcome = "error"
+            return "Error: Failed to process PDF file. Please try again."
+        if text.startswith("Error:"):
+            timer.outcome = "error"
+        return text
+
+async def get_resume_by_content_hash(
+    db: AsyncSession,
+    content_sha256: str,
+    user: User
+) -> Resume | None:
+    """
+    Finds an earlier upload of the exact same file by this user.
+    """
+    result = await db.execute(
+        select(Resume)
+        .filter(Resume.user_id == user.id, Resume.content_sha256 == content_sha256)
+        .order_by(Resume.uploaded_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
 async def create_resume(
     db: AsyncSession, 
     resume_data: ResumeCreate, 
@@ -40,25 +307,18 @@ async def create_resume(
     db_resume = Resume(
         original_filename=resume_data.original_filename,
         extracted_text=resume_data.extracted_text,
+        content_sha256=resume_data.content_sha256,
         user_id=user.id  # Link to the current user
     )
     db.add(db_resume)
     await db.commit()
-    await db.refresh(db_resume)
+    await db.refresh(db_resume, ["uploaded_at"]) # Don't read the text back
     return db_resume
 
 
-async def generate_optimized_resume(
-    resume_text: str,
-    role_profile: TargetRoleProfile
-) -> str:
-    """
-    Calls Gemini to rewrite a resume to be ATS-friendly and matched
-    to the ideal profile.
-    """
-    model = genai.GenerativeModel('gemini-2.5-flash') # No JSON mode needed
-
-    prompt = f"""
+def _build_optimize_prompt(resume_text: str, role_profile: TargetRoleProfile) -> str:
+    """Builds the resume-rewrite prompt shared by the blocking and streaming calls."""
+    return f"""
     You are an expert resume writer. Your task is to rewrite the provided resume
     to be ATS-friendly and highly aligned with the "Ideal Candidate Profile".
 
@@ -84,20 +344,96 @@ async def generate_optimized_resume(
     **ATS-OPTIMIZED RESUME (PLAIN TEXT):**
     """
 
+async def generate_optimized_resume(
+    resume_text: str,
+    role_profile: TargetRoleProfile
+) -> str:
+    """
+    Calls Gemini to rewrite a resume to be ATS-friendly and matched
+    to the ideal profile.
+    Raises GeminiOverloaded if no Gemini slot is available.
+    """
+    prompt = _build_optimize_prompt(resume_text, role_profile)
+
     try:
-        response = await model.generate_content_async(prompt)
-        return response.text
+        with metrics.stage("optimize", "gemini"):
+            return await gemini_gateway.generate("optimize", prompt)
+    except gemini_gateway.GeminiOverloaded:
+        raise
     except Exception as e:
         print(f"Error calling Gemini for resume optimization: {e}")
         return "Error: Could not generate optimized resume."
 
-async def get_resumes_by_user(db: AsyncSession, user: User) -> List[Resume]:
+async def stream_optimized_resume(
+    resume_text: str,
+    role_profile: TargetRoleProfile
+) -> AsyncIterator[str]:
     """
-    Fetches all resumes uploaded by a specific user.
+    Like generate_optimized_resume, but yields the text as Gemini
+    generates it.
+
+    Closing the generator early (e.g. the client disconnected) stops
+    reading from Gemini and drops the underlying call, so abandoned
+    generations aren't paid for to the end.
     """
-    result = await db.execute(
-        select(Resume)
+    prompt = _build_optimize_prompt(resume_text, role_profile)
+
+    with metrics.stage("optimize", "gemini_stream"):
+        async with aclosing(gemini_gateway.stream("optimize", prompt)) as chunks:
+            async for text_chunk in chunks:
+                yield text_chunk
+
+def encode_history_cursor(uploaded_at: datetime, resume_id: int) -> str:
+    """Encodes the position after a history row as an opaque cursor."""
+    raw = f"{uploaded_at.isoformat()}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodes a history cursor. Raises ValueError if it's malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        uploaded_at, resume_id = raw.split("|")
+        return datetime.fromisoformat(uploaded_at), int(resume_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+async def get_resumes_by_user(
+    db: AsyncSession,
+    user: User,
+    limit: int | None = 20,
+    cursor: str | None = None
+) -> Tuple[List[ResumeInfo], str | None]:
+    """
+    Fetches one page of the resumes uploaded by a specific user, newest
+    first, and the cursor of the next page (None on the last one).
+    With limit=None, every resume is returned as a single page.
+
+    Only the listed columns are loaded (never the resume text), and the
+    page is located with keyset pagination on (uploaded_at, id), so deep
+    pages cost the same as the first one.
+    """
+    query = (
+        select(Resume.id, Resume.original_filename, Resume.uploaded_at, Resume.char_count)
         .filter(Resume.user_id == user.id)
-        .order_by(Resume.uploaded_at.desc())
     )
-    return result.scalars().all()
\ No newline at end of file
+    if cursor:
+        uploaded_at, resume_id = decode_history_cursor(cursor)
+        query = query.filter(
+            tuple_(Resume.uploaded_at, Resume.id) < tuple_(uploaded_at, resume_id)
+        )
+
+    query = query.order_by(Resume.uploaded_at.desc(), Resume.id.desc())
+    if limit is None:
+        result = await db.execute(query)
+        return [ResumeInfo.model_validate(row) for row in result.all()], None
+
+    # One extra row tells us whether there's a next page
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+
+    items = [ResumeInfo.model_validate(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_history_cursor(last.uploaded_at, last.id)
+    return items, next_cursor
@@ -1,71 +1,190 @@
+import asyncio
 import httpx
-import google.generativeai as genai
 import json
+import time
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, or_, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import Any, Dict, List
 
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.models import TargetRoleProfile
+from app.core.http_client import get_http_client
+from app.db.database import async_session
+from app.db.models import AnalysisHistory, TargetRoleProfile
 from app.schemas.role import GeminiRoleProfileSchema
-
-# Configure the Gemini client
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+from app.services import gemini_gateway
+from app.services.job_preprocessing import preprocess_job_descriptions
 
 # Constants
 CACHE_DURATION_DAYS = 7
-ARBEITNOW_API_URL = "https://www.arbeitnow.com/api/job-board-api"
+REFRESH_CLAIM_TIMEOUT_MINUTES = 10 # A refresh claim older than this is considered abandoned
 JOB_FETCH_LIMIT = 10 # Number of job descriptions to fetch
+JOB_BOARD_CACHE_RETENTION_SECONDS = 24 * 3600 # Kept this long for conditional re-fetches
+
+# In-memory tier in front of the target_role_profiles table. Only fresh
+# profiles are cached, and each entry expires when its profile goes stale.
+_profile_cache = TTLCache(
+    maxsize=settings.ROLE_PROFILE_CACHE_SIZE,
+    ttl=timedelta(days=CACHE_DURATION_DAYS).total_seconds()
+)
+
+# Job board responses, keyed by (normalized query, page). An entry is
+# served as-is for JOB_BOARD_CACHE_TTL_SECONDS, then revalidated with its
+# ETag / Last-Modified until it's dropped after the retention period.
+_job_board_cache = TTLCache(
+    maxsize=settings.JOB_BOARD_CACHE_SIZE,
+    ttl=JOB_BOARD_CACHE_RETENTION_SECONDS
+)
+
+PROFILE_CACHE_ENTRIES = metrics.gauge(
+    "role_profile_cache_entries",
+    "Profiles in this worker's in-memory cache."
+)
+PROFILE_CACHE_EVENTS = metrics.counter(
+    "role_profile_cache_events_total",
+    "Lookups and removals in the in-memory profile cache.",
+    labelnames=("event",) # hit, miss, eviction, expiration
+)
+
+
+def _collect_profile_cache_metrics() -> None:
+    stats = _profile_cache.stats()
+    PROFILE_CACHE_ENTRIES.set(stats["size"])
+    for event, key in (("hit", "hits"), ("miss", "misses"), ("eviction", "evictions"), ("expiration", "expirations")):
+        PROFILE_CACHE_EVENTS.set(stats[key], event=event)
+
+
+metrics.register_collector(_collect_profile_cache_metrics)
 
 # --- 1. External API: Fetch Job Descriptions (with filtering) ---
 
+async def _fetch_job_board_page(query: str, page: int) -> Dict[str, Any]:
+    """
+    Fetches one page of job board results, using the local cache and
+    conditional requests where possible.
+    """
+    cache_key = (query.strip().lower(), page)
+    cached = _job_board_cache.get(cache_key)
+
+    if cached and time.monotonic() - cached["fetched_at"] < settings.JOB_BOARD_CACHE_TTL_SECONDS:
+        with metrics.stage("role_profile", "job_board_page", cache="hit"):
+            return cached["payload"]
+
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with metrics.stage("role_profile", "job_board_page", cache="miss") as timer:
+        response = await get_http_client().get(
+            settings.ARBEITNOW_API_URL,
+            params={"query": query, "page": page},
+            headers=headers
+        )
+
+        if response.status_code == 304 and cached:
+            # Unchanged: keep the payload we have and restart its TTL
+            timer.cache = "revalidated"
+            cached["fetched_at"] = time.monotonic()
+            _job_board_cache.set(cache_key, cached)
+            return cached["payload"]
+
+        response.raise_for_status()
+        payload = response.json()
+
+    _job_board_cache.set(cache_key, {
+        "payload": payload,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.monotonic(),
+    })
+    return payload
+
 async def get_job_descriptions(role_name: str) -> List[str]:
     """
     Fetches live job descriptions from the Arbeitnow API and
     filters them for relevance.
+
+    Pages are fetched concurrently (JOB_FETCH_FAN_OUT at a time, up to
+    JOB_FETCH_MAX_PAGES) until JOB_FETCH_LIMIT relevant descriptions are
+    collected, the results run out, or JOB_FETCH_DEADLINE_SECONDS passes.
     """
     # Create normalized keywords from the role name
     # e.g., "React Developer" -> ["react", "developer"]
     keywords = role_name.strip().lower().split()
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                ARBEITNOW_API_URL,
-                params={"query": role_name, "page": 1}
-            )
-            response.raise_for_status() 
-            data = response.json()
-            
-            filtered_jobs = []
-            
-            for job in data.get("data", []):
-                job_title_lower = job.get("title", "").lower()
-                job_description = job.get("description", "")
-
-                # THE FIX: Check if all keywords are in the job title
-                if job_description and all(keyword in job_title_lower for keyword in keywords):
-                    filtered_jobs.append(job_description)
-
-            if not filtered_jobs:
-                # Fallback if our strict filter got 0 results
-                descriptions = [
-                    job.get("description", "") 
-                    for job in data.get("data", []) 
-                    if job.get("description")
-                ]
-                return [desc for desc in descriptions if desc][:JOB_FETCH_LIMIT]
-
-            # Return a cleaned, limited list of *filtered* jobs
-            return [desc for desc in filtered_jobs if desc][:JOB_FETCH_LIMIT]
-            
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error fetching jobs: {e}")
-            return []
-        except Exception as e:
-            print(f"Error fetching jobs: {e}")
-            return []
+
+    filtered_jobs: List[str] = []
+    fallback_jobs: List[str] = [] # Any job with a description, in case the filter finds nothing
+
+    pending: Dict[asyncio.Task, int] = {} # fetch task -> page number
+    next_page = 1
+    no_more_pages = False
+
+    try:
+        async with asyncio.timeout(settings.JOB_FETCH_DEADLINE_SECONDS):
+            while True:
+                # Keep up to JOB_FETCH_FAN_OUT pages in flight
+                while (
+                    not no_more_pages
+                    and len(pending) < settings.JOB_FETCH_FAN_OUT
+                    and next_page <= settings.JOB_FETCH_MAX_PAGES
+                    and len(filtered_jobs) < JOB_FETCH_LIMIT
+                ):
+                    task = asyncio.create_task(_fetch_job_board_page(role_name, next_page))
+                    pending[task] = next_page
+                    next_page += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = pending.pop(task)
+                    try:
+                        data = task.result()
+                    except httpx.HTTPStatusError as e:
+                        print(f"HTTP error fetching jobs (page {page}): {e}")
+                        continue
+                    except Exception as e:
+                        print(f"Error fetching jobs (page {page}): {e}")
+                        continue
+
+                    jobs = data.get("data", [])
+                    links = data.get("links")
+                    if not jobs or (links is not None and not links.get("next")):
+                        no_more_pages = True
+
+                    for job in jobs:
+                        job_title_lower = job.get("title", "").lower()
+                        job_description = job.get("description", "")
+                        if not job_description:
+                            continue
+
+                        # Check if all keywords are in the job title
+                        if all(keyword in job_title_lower for keyword in keywords):
+                            filtered_jobs.append(job_description)
+                        elif len(fallback_jobs) < JOB_FETCH_LIMIT:
+                            fallback_jobs.append(job_description)
+
+                if len(filtered_jobs) >= JOB_FETCH_LIMIT:
+                    break
+    except TimeoutError:
+        print(f"Job fetch deadline reached for '{role_name}', using what we have.")
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if not filtered_jobs:
+        # Fallback if our strict filter got 0 results
+        return fallback_jobs[:JOB_FETCH_LIMIT]
+
+    # Return a limited list of *filtered* jobs
+    return filtered_jobs[:JOB_FETCH_LIMIT]
 
 # --- 2. AI Call: Synthesize Profile ---
 
@@ -82,12 +201,6 @@ async def get_ideal_profile_from_gemini(
     # Combine descriptions into one large text block
     combined_descriptions = "\n\n---JOB SEPARATOR---\n\n".join(job_descriptions)
 
-    # Set up the model for JSON output
-    model = genai.GenerativeModel(
-        'gemini-2.5-flash',
-        generation_config={"response_mime_type": "application/json"}
-    )
-    
     prompt = f"""
     Analyze the following {len(job_descriptions)} job descriptions for a '{role_name}' position. 
     Based *only* on the text provided, synthesize an 'Ideal Candidate Profile'.
@@ -100,11 +213,12 @@ async def get_ideal_profile_from_gemini(
     """
     
     try:
-        response = await model.generate_content_async(prompt)
-        response_text = response.text
+        with metrics.stage("role_profile", "gemini"):
+            response_text = await gemini_gateway.generate("role_profile", prompt, json_mode=True)
         
         # Parse and validate the JSON response using our Pydantic schema
-        profile_data = GeminiRoleProfileSchema.model_validate_json(response_text)
+        with metrics.stage("role_profile", "validate"):
+            profile_data = GeminiRoleProfileSchema.model_validate_json(response_text)
         return profile_data
         
     except Exception as e:
@@ -114,33 +228,107 @@ async def get_ideal_profile_from_gemini(
 
 # --- 3. Main Service: Caching & Orchestration (with UPDATE logic) ---
 
-async def get_or_create_role_profile(
-    db: AsyncSession, 
-    role_name: str
-) -> TargetRoleProfile:
+# Generations currently running in this process, keyed by normalized role.
+# Concurrent requests for the same role await the same task instead of each
+# calling Arbeitnow and Gemini on their own.
+_inflight_generations: Dict[str, asyncio.Task] = {}
+
+
+def _is_fresh(profile: TargetRoleProfile | None) -> bool:
+    """Returns True if the profile exists and is inside the cache window."""
+    if profile is None:
+        return False
+    cache_cutoff = datetime.now(timezone.utc) - timedelta(days=CACHE_DURATION_DAYS)
+    return profile.created_at >= cache_cutoff
+
+
+def _cache_profile(profile: TargetRoleProfile) -> None:
+    """Caches a fresh profile until the moment it goes stale."""
+    stale_at = profile.created_at + timedelta(days=CACHE_DURATION_DAYS)
+    remaining = (stale_at - datetime.now(timezone.utc)).total_seconds()
+    _profile_cache.set(profile.role_name, profile, ttl=remaining)
+
+
+def get_profile_cache_stats() -> Dict[str, int]:
+    """Returns size and hit/miss/eviction counters of the profile cache."""
+    return _profile_cache.stats()
+
+
+async def preload_profile_cache(db: AsyncSession, limit: int) -> int:
     """
-    Main logic: Check cache, or fetch, generate, and save a new profile.
-    If profile is stale, it will be updated.
+    Loads the `limit` most-analyzed fresh profiles into the in-memory cache
+    (used at startup, so the popular roles are hits from the first request).
+    Returns how many were cached.
     """
-    # Sanitize role name
-    normalized_role = role_name.strip().lower()
+    if limit <= 0:
+        return 0
+    cache_cutoff = datetime.now(timezone.utc) - timedelta(days=CACHE_DURATION_DAYS)
+    usage = (
+        select(AnalysisHistory.role_profile_id, func.count().label("uses"))
+        .group_by(AnalysisHistory.role_profile_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(TargetRoleProfile)
+        .join(usage, usage.c.role_profile_id == TargetRoleProfile.id)
+        .filter(TargetRoleProfile.created_at >= cache_cutoff)
+        .order_by(usage.c.uses.desc())
+        .limit(min(limit, settings.ROLE_PROFILE_CACHE_SIZE))
+    )
+    profiles = result.scalars().all()
+    # Least used first, so the most used are the last to be evicted
+    for profile in reversed(profiles):
+        _cache_profile(profile)
+    return len(profiles)
 
-    # 1. Check for ANY existing profile, regardless of time
+
+async def _get_profile(db: AsyncSession, normalized_role: str) -> TargetRoleProfile | None:
+    """Fetches the stored profile for a role, regardless of its age."""
     result = await db.execute(
         select(TargetRoleProfile)
         .filter(TargetRoleProfile.role_name == normalized_role)
     )
-    existing_profile = result.scalars().first()
+    return result.scalars().first()
 
-    # 2. Check if it's fresh enough
-    cache_cutoff = datetime.now(timezone.utc) - timedelta(days=CACHE_DURATION_DAYS)
 
-    if existing_profile and existing_profile.created_at >= cache_cutoff:
-        # It exists and is fresh, return it immediately.
+async def _acquire_write_lock(db: AsyncSession, normalized_role: str) -> None:
+    """
+    Takes a transaction-scoped Postgres advisory lock for this role, so only
+    one worker process writes its profile at a time. The lock is released
+    when the session's transaction commits or rolls back.
+    """
+    if not settings.ROLE_PROFILE_ADVISORY_LOCK:
+        return
+    if db.get_bind().dialect.name != "postgresql":
+        return
+
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"),
+        {"lock_key": f"target_role_profile:{normalized_role}"}
+    )
+
+
+async def _generate_role_profile(role_name: str, normalized_role: str) -> TargetRoleProfile:
+    """
+    Fetches jobs, synthesizes a profile and saves it (insert or update).
+    Runs in its own sessions because it outlives the request that started it.
+
+    No connection is held while the job board and Gemini are called: the
+    advisory lock only covers the final re-check and write, so a profile
+    another worker saved in the meantime wins over this one.
+    """
+    # Another worker may have refreshed the profile since the caller looked
+    async with async_session() as db:
+        existing_profile = await _get_profile(db, normalized_role)
+    if _is_fresh(existing_profile):
+        _cache_profile(existing_profile)
         return existing_profile
 
-    # 3. If it's stale (or doesn't exist), we must generate new data.
-    job_descriptions = await get_job_descriptions(role_name)
+    # Fetch, then clean up (HTML, boilerplate, reposts) to keep the prompt small
+    with metrics.stage("role_profile", "job_fetch"):
+        raw_descriptions = await get_job_descriptions(role_name)
+    with metrics.stage("role_profile", "preprocess"):
+        job_descriptions = preprocess_job_descriptions(raw_descriptions)
     if not job_descriptions:
         raise Exception("Could not fetch job descriptions for this role.")
 
@@ -155,27 +343,179 @@ async def get_or_create_role_profile(
     }
     source_info = {"source": "arbeitnow.com", "jobs_analyzed": len(job_descriptions)}
 
-    # 4. THE KEY FIX: Update if it exists, Insert if it's new
-    if existing_profile:
-        # It's an UPDATE
-        existing_profile.ideal_profile_text = gemini_profile.ideal_profile_summary
-        existing_profile.top_skills_json = json.dumps(all_skills)
-        existing_profile.source_job_examples = json.dumps(source_info)
-        existing_profile.created_at = datetime.now(timezone.utc) # Update timestamp
+    async with async_session() as db:
+        with metrics.stage("role_profile", "generation_lock"):
+            await _acquire_write_lock(db, normalized_role)
+
+            # Re-read under the lock: another worker may have saved it while we generated
+            existing_profile = await _get_profile(db, normalized_role)
+        if _is_fresh(existing_profile):
+            await db.commit() # Releases the advisory lock
+            _cache_profile(existing_profile)
+            return existing_profile
+
+        # Update if it exists, Insert if it's new
+        if existing_profile:
+            # It's an UPDATE
+            existing_profile.ideal_profile_text = gemini_profile.ideal_profile_summary
+            existing_profile.top_skills_json = json.dumps(all_skills)
+            existing_profile.source_job_examples = json.dumps(source_info)
+            existing_profile.created_at = datetime.now(timezone.utc) # Update timestamp
+            existing_profile.refresh_started_at = None # Release the refresh claim
+            existing_profile.version = existing_profile.version + 1
+
+            with metrics.stage("role_profile", "save"):
+                await db.commit()
+                await db.refresh(existing_profile)
+
+            # Replace the old entry with the fresh profile
+            _profile_cache.invalidate(normalized_role)
+            _cache_profile(existing_profile)
+            return existing_profile
+        else:
+            # It's an INSERT
+            new_profile = TargetRoleProfile(
+                role_name=normalized_role,
+                ideal_profile_text=gemini_profile.ideal_profile_summary,
+                top_skills_json=json.dumps(all_skills),
+                source_job_examples=json.dumps(source_info)
+            )
+
+            db.add(new_profile)
+            with metrics.stage("role_profile", "save"):
+                await db.commit()
+                await db.refresh(new_profile)
+
+            _cache_profile(new_profile)
+            return new_profile
 
+
+def _start_or_join_generation(role_name: str, normalized_role: str) -> asyncio.Task:
+    """
+    Returns the in-flight generation task for this role, starting one if
+    none is running.
+    """
+    task = _inflight_generations.get(normalized_role)
+    if task is not None:
+        return task
+
+    task = asyncio.create_task(_generate_role_profile(role_name, normalized_role))
+    _inflight_generations[normalized_role] = task
+
+    def _on_done(finished: asyncio.Task) -> None:
+        if _inflight_generations.get(normalized_role) is finished:
+            del _inflight_generations[normalized_role]
+        # Retrieve (and log) the exception; background refreshes have no waiter
+        if not finished.cancelled() and finished.exception() is not None:
+            print(f"Error generating role profile for '{normalized_role}': {finished.exception()}")
+
+    task.add_done_callback(_on_done)
+    return task
+
+
+async def _claim_refresh(profile_id: int) -> bool:
+    """
+    Marks a profile as refreshing, unless another request or worker already
+    holds a recent claim. Returns True if this caller won the claim.
+
+    A failed refresh keeps its claim, so it is retried only after the claim
+    times out rather than on every request.
+    """
+    claim_cutoff = datetime.now(timezone.utc) - timedelta(minutes=REFRESH_CLAIM_TIMEOUT_MINUTES)
+
+    async with async_session() as db:
+        result = await db.execute(
+            update(TargetRoleProfile)
+            .where(
+                TargetRoleProfile.id == profile_id,
+                or_(
+                    TargetRoleProfile.refresh_started_at.is_(None),
+                    TargetRoleProfile.refresh_started_at < claim_cutoff
+                )
+            )
+            .values(refresh_started_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        await db.refresh(existing_profile)
+        return result.rowcount == 1
+
+
+async def _schedule_background_refresh(
+    role_name: str,
+    normalized_role: str,
+    profile: TargetRoleProfile
+) -> None:
+    """
+    Starts a background refresh of a stale profile, if no one else is
+    refreshing it already.
+    """
+    if normalized_role in _inflight_generations:
+        return
+
+    try:
+        claimed = await _claim_refresh(profile.id)
+    except Exception as e:
+        # Serving the stale row matters more than refreshing it right now
+        print(f"Error claiming refresh for role '{normalized_role}': {e}")
+        return
+
+    if claimed:
+        _start_or_join_generation(role_name, normalized_role)
+
+
+async def get_or_create_role_profile(
+    db: AsyncSession, 
+    role_name: str,
+    serve_stale: bool | None = None
+) -> TargetRoleProfile:
+    """
+    Main logic: Check cache, or fetch, generate, and save a new profile.
+    If profile is stale, it will be updated.
+
+    Fresh profiles are served from an in-process cache first, so the common
+    case doesn't touch the database.
+
+    Concurrent callers for the same role share one generation, and workers
+    serialize their writes through a Postgres advisory lock.
+
+    With serve_stale (defaults to ROLE_PROFILE_SERVE_STALE), a stale profile
+    younger than ROLE_PROFILE_HARD_EXPIRY_DAYS is returned immediately and
+    refreshed in the background.
+    """
+    # Sanitize role name
+    normalized_role = role_name.strip().lower()
+
+    # 1. Check the in-memory cache, which only holds fresh profiles
+    with metrics.stage("role_profile", "memory_cache") as timer:
+        cached_profile = _profile_cache.get(normalized_role)
+        timer.cache = "hit" if cached_profile is not None else "miss"
+    if cached_profile is not None:
+        return cached_profile
+
+    # 2. Check for ANY existing profile, and return it if it's fresh enough
+    with metrics.stage("role_profile", "db_lookup") as timer:
+        existing_profile = await _get_profile(db, normalized_role)
+        if _is_fresh(existing_profile):
+            timer.cache = "hit"
+        else:
+            timer.cache = "stale" if existing_profile else "miss"
+    if _is_fresh(existing_profile):
+        _cache_profile(existing_profile)
         return existing_profile
-    else:
-        # It's an INSERT
-        new_profile = TargetRoleProfile(
-            role_name=normalized_role,
-            ideal_profile_text=gemini_profile.ideal_profile_summary,
-            top_skills_json=json.dumps(all_skills),
-            source_job_examples=json.dumps(source_info)
-        )
 
-        db.add(new_profile)
-        await db.commit()
-        await db.refresh(new_profile)
-        return new_profile
\ No newline at end of file
+    # 3. If it's stale but not expired, serve it and refresh in the background
+    if serve_stale is None:
+        serve_stale = settings.ROLE_PROFILE_SERVE_STALE
+    hard_cutoff = datetime.now(timezone.utc) - timedelta(days=settings.ROLE_PROFILE_HARD_EXPIRY_DAYS)
+
+    if serve_stale and existing_profile and existing_profile.created_at >= hard_cutoff:
+        await _schedule_background_refresh(role_name, normalized_role, existing_profile)
+        return existing_profile
+
+    # 4. If it's expired (or doesn't exist), join (or start) the generation.
+    # Shielded so one client disconnecting doesn't cancel it for the others.
+    with metrics.stage("role_profile", "generation") as timer:
+        # "hit" when joining a generation another request already started
+        timer.cache = "hit" if normalized_role in _inflight_generations else "miss"
+        task = _start_or_join_generation(role_name, normalized_role)
+        return await asyncio.shield(task)
@@ -1,25 +1,158 @@
+import asyncio
 import json
-import google.generativeai as genai
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import undefer
+from typing import List
 
+from app.core import metrics
 from app.core.config import settings
-from app.db.models import Resume, TargetRoleProfile, User
-from app.schemas.skill_gap import GeminiSkillGapSchema, SkillGapRequest
+from app.db.database import async_session
+from app.db.models import AnalysisHistory, Resume, TargetRoleProfile, User
+from app.schemas.skill_gap import (
+    AnalysisHistoryDetail,
+    AnalysisHistoryInfo,
+    GeminiSkillGapSchema,
+    SkillGapBatchItem,
+    SkillGapRequest,
+    SkillMatchPreview,
+)
+from app.services import gemini_gateway, role_service, skill_matcher
 
-# Configure the Gemini client
-genai.configure(api_key=settings.GOOGLE_API_KEY)
-
-async def get_resume_by_id(db: AsyncSession, resume_id: int, user: User) -> Resume:
+async def get_resume_by_id(
+    db: AsyncSession,
+    resume_id: int,
+    user: User,
+    with_text: bool = False
+) -> Resume:
     """
     Fetches a specific resume by its ID, ensuring it belongs to the current user.
+    The full text is deferred; pass with_text=True to read resume.extracted_text.
     """
-    result = await db.execute(
-        select(Resume).filter(Resume.id == resume_id, Resume.user_id == user.id)
-    )
+    query = select(Resume).filter(Resume.id == resume_id, Resume.user_id == user.id)
+    if with_text:
+        query = query.options(undefer(Resume.extracted_text_compressed))
+    result = await db.execute(query)
     resume = result.scalars().first()
     return resume
 
+async def load_resume_text(db: AsyncSession, resume: Resume) -> None:
+    """
+    Loads the deferred text of a resume fetched without it, so that
+    resume.extracted_text can be read (also after the session closes).
+    """
+    await db.refresh(resume, ["extracted_text_compressed"])
+
+# --- Analysis History ---
+
+async def get_saved_analysis(
+    db: AsyncSession,
+    user: User,
+    resume_id: int,
+    role_profile: TargetRoleProfile,
+    learning_preference: str
+) -> GeminiSkillGapSchema | None:
+    """
+    Returns a saved analysis with identical inputs (same resume, same
+    version of the role profile, same learning preference), if any.
+    """
+    result = await db.execute(
+        select(AnalysisHistory.result_json)
+        .filter(
+            AnalysisHistory.user_id == user.id,
+            AnalysisHistory.resume_id == resume_id,
+            AnalysisHistory.role_profile_id == role_profile.id,
+            AnalysisHistory.role_profile_version == role_profile.version,
+            AnalysisHistory.learning_preference == learning_preference
+        )
+        .order_by(AnalysisHistory.created_at.desc())
+        .limit(1)
+    )
+    result_json = result.scalars().first()
+    if result_json is None:
+        return None
+    return GeminiSkillGapSchema.model_validate_json(result_json)
+
+async def save_analysis(
+    db: AsyncSession,
+    user: User,
+    resume_id: int,
+    role_profile: TargetRoleProfile,
+    learning_preference: str,
+    analysis: GeminiSkillGapSchema
+) -> AnalysisHistory:
+    """
+    Saves an analysis result so it can be listed and reused later.
+    """
+    db_analysis = AnalysisHistory(
+        user_id=user.id,
+        resume_id=resume_id,
+        role_profile_id=role_profile.id,
+        role_profile_version=role_profile.version,
+        learning_preference=learning_preference,
+        skill_match_score=analysis.skill_match_score,
+        result_json=analysis.model_dump_json()
+    )
+    db.add(db_analysis)
+    await db.commit()
+    await db.refresh(db_analysis)
+    return db_analysis
+
+def _history_query(user: User):
+    """Selects the listing columns of a user's analyses, with the role name."""
+    return (
+        select(
+            AnalysisHistory.id,
+            AnalysisHistory.resume_id,
+            TargetRoleProfile.role_name,
+            AnalysisHistory.role_profile_version,
+            AnalysisHistory.learning_preference,
+            AnalysisHistory.skill_match_score,
+            AnalysisHistory.created_at
+        )
+        .join(TargetRoleProfile, TargetRoleProfile.id == AnalysisHistory.role_profile_id)
+        .filter(AnalysisHistory.user_id == user.id)
+    )
+
+async def get_analyses_by_user(
+    db: AsyncSession,
+    user: User,
+    limit: int = 50
+) -> List[AnalysisHistoryInfo]:
+    """
+    Fetches a user's most recent analyses, without their full results.
+    """
+    result = await db.execute(
+        _history_query(user)
+        .order_by(AnalysisHistory.created_at.desc())
+        .limit(limit)
+    )
+    return [AnalysisHistoryInfo.model_validate(row) for row in result.all()]
+
+async def get_analysis_by_id(
+    db: AsyncSession,
+    user: User,
+    analysis_id: int
+) -> AnalysisHistoryDetail | None:
+    """
+    Fetches a single saved analysis, ensuring it belongs to the current user.
+    """
+    result = await db.execute(
+        _history_query(user)
+        .add_columns(AnalysisHistory.result_json)
+        .filter(AnalysisHistory.id == analysis_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    return AnalysisHistoryDetail(
+        **AnalysisHistoryInfo.model_validate(row).model_dump(),
+        result=GeminiSkillGapSchema.model_validate_json(row.result_json)
+    )
+
+# --- AI Call: Skill Gap Analysis ---
+
 async def generate_skill_gap_analysis(
     resume_text: str,
     role_profile: TargetRoleProfile,
@@ -27,18 +160,25 @@ async def generate_skill_gap_analysis(
 ) -> GeminiSkillGapSchema:
     """
     Calls Gemini to perform the skill gap analysis.
+
+    Technical skills found verbatim in the resume are marked 'Matched'
+    locally; only the remaining skills are sent to Gemini to classify.
     """
     
-    # Set up the model for JSON output
-    model = genai.GenerativeModel(
-        'gemini-2.5-flash',
-        generation_config={"response_mime_type": "application/json"}
-    )
-    
     # Get the target skills from the role profile
     # The 'top_skills_json' is a string, so we parse it
     target_skills_data = json.loads(role_profile.top_skills_json)
-    target_skills_list = target_skills_data.get("technical", []) + target_skills_data.get("soft", [])
+    technical_skills = target_skills_data.get("technical", [])
+    soft_skills = target_skills_data.get("soft", [])
+    target_skills_list = technical_skills + soft_skills
+
+    # Pre-classify the obvious matches without the model
+    with metrics.stage("skill_gap", "pre_classify"):
+        local_matches, unresolved_skills = skill_matcher.pre_classify(
+            resume_text, technical_skills, soft_skills
+        )
+    confirmed_skills = [item.skill_name for item in local_matches]
+    confirmed_lowered = {skill.lower() for skill in confirmed_skills}
     
     prompt = f"""
     You are "SkillSync AI," an expert career mentor. Your job is to perform a detailed skill-gap analysis.
@@ -54,7 +194,10 @@ async def generate_skill_gap_analysis(
     ---
 
     **KEY TARGET SKILLS for {role_profile.role_name}:**
-    {', '.join(target_skills_list)}
+    {', '.join(unresolved_skills) or '(none)'}
+
+    **SKILLS ALREADY CONFIRMED IN THE RESUME:**
+    {', '.join(confirmed_skills) or '(none)'}
 
     **USER'S LEARNING PREFERENCE:**
     {learning_preference}
@@ -66,10 +209,11 @@ async def generate_skill_gap_analysis(
     {GeminiSkillGapSchema.model_json_schema()}
 
     **INSTRUCTIONS:**
-    1.  **skill_match_score**: Calculate a score (0.0-100.0) based on how well the resume matches the *ideal profile* and *key skills*.
+    1.  **skill_match_score**: Calculate a score (0.0-100.0) based on how well the resume matches the *ideal profile*, the *key skills* and the *already confirmed* skills.
     2.  **analysis_summary**: Write a motivational summary. Highlight strengths and the top 2-3 skills to learn.
     3.  **skill_comparison**:
-        * Iterate through *all* skills in the "KEY TARGET SKILLS" list.
+        * Iterate through *all* skills in the "KEY TARGET SKILLS" list, and *only* those.
+        * Do NOT include the "SKILLS ALREADY CONFIRMED" in `skill_comparison`; they are added separately.
         * For each skill, set `match_status` ('Matched', 'Partial', 'Missing').
         * Write a `justification` explaining *why* (e.g., "Matched: 'React' is listed under Projects section.").
         * If `match_status` is 'Missing' or 'Partial', provide a `learning_plan` with 3-5 steps.
@@ -82,8 +226,8 @@ async def generate_skill_gap_analysis(
     """
     
     try:
-        response = await model.generate_content_async(prompt)
-        response_text = response.text
+        with metrics.stage("skill_gap", "gemini"):
+            response_text = await gemini_gateway.generate("skill_gap", prompt, json_mode=True)
         
         # --- THIS IS THE FIX ---
         # Clean the response: remove leading/trailing whitespace and
@@ -92,12 +236,130 @@ async def generate_skill_gap_analysis(
         # --- END FIX ---
 
         # Parse and validate the CLEANED response
-        analysis_data = GeminiSkillGapSchema.model_validate_json(sanitized_text)
-        return analysis_data
+        with metrics.stage("skill_gap", "validate"):
+            analysis_data = GeminiSkillGapSchema.model_validate_json(sanitized_text)
         
+    except gemini_gateway.GeminiOverloaded:
+        raise
     except Exception as e:
         print(f"Error calling Gemini or validating skill-gap JSON: {e}")
         # In a real app, you might want to retry or handle this more gracefully
         # For debugging:
         print(f"Raw response from Gemini: {response_text if 'response_text' in locals() else 'N/A'}")
-        raise Exception(f"Failed to get valid analysis from AI. {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to get valid analysis from AI. {str(e)}")
+
+    # Merge the local matches back in, in the role profile's skill order
+    skill_order = {skill.lower(): index for index, skill in enumerate(target_skills_list)}
+    model_items = [
+        item for item in analysis_data.skill_comparison
+        if item.skill_name.lower() not in confirmed_lowered
+    ]
+    analysis_data.skill_comparison = sorted(
+        local_matches + model_items,
+        key=lambda item: skill_order.get(item.skill_name.lower(), len(skill_order))
+    )
+    return analysis_data
+
+def preview_skill_match(resume_text: str, role_profile: TargetRoleProfile) -> SkillMatchPreview:
+    """
+    Instant local match estimate for a resume and role, without calling Gemini.
+    """
+    target_skills_data = json.loads(role_profile.top_skills_json)
+    return skill_matcher.preview(
+        resume_text,
+        technical_skills=target_skills_data.get("technical", []),
+        soft_skills=target_skills_data.get("soft", [])
+    )
+
+# --- Batch: one resume against several roles ---
+
+async def _analyze_role_for_batch(
+    user: User,
+    resume_id: int,
+    resume_text: str,
+    role_name: str,
+    learning_preference: str
+) -> SkillGapBatchItem:
+    """
+    Runs the full analysis for one role of a batch in its own session
+    (sessions can't be shared between concurrent tasks). Failures of the
+    role profile and the AI call are returned as the item's error instead
+    of raised; analyze_resume_for_roles catches anything else.
+    """
+    async with async_session() as db:
+        try:
+            role_profile = await role_service.get_or_create_role_profile(db, role_name=role_name)
+        except Exception as e:
+            return SkillGapBatchItem(role_name=role_name, error=f"Failed to analyze role: {str(e)}")
+
+        saved_analysis = await get_saved_analysis(
+            db,
+            user=user,
+            resume_id=resume_id,
+            role_profile=role_profile,
+            learning_preference=learning_preference
+        )
+        if saved_analysis:
+            return SkillGapBatchItem(role_name=role_name, result=saved_analysis)
+
+        try:
+            analysis_result = await generate_skill_gap_analysis(
+                resume_text=resume_text,
+                role_profile=role_profile,
+                learning_preference=learning_preference
+            )
+        except Exception as e:
+            return SkillGapBatchItem(
+                role_name=role_name,
+                error=f"Failed to generate skill gap analysis: {str(e)}"
+            )
+
+        await save_analysis(
+            db,
+            user=user,
+            resume_id=resume_id,
+            role_profile=role_profile,
+            learning_preference=learning_preference,
+            analysis=analysis_result
+        )
+        return SkillGapBatchItem(role_name=role_name, result=analysis_result)
+
+async def analyze_resume_for_roles(
+    user: User,
+    resume: Resume,
+    role_names: List[str],
+    learning_preference: str
+) -> List[SkillGapBatchItem]:
+    """
+    Analyzes one (already loaded) resume against several roles, running
+    up to SKILL_GAP_BATCH_CONCURRENCY roles at once. Returns one item per
+    distinct role, in request order.
+    """
+    # Drop repeats of the same role ("React Developer" / "react developer")
+    distinct_roles: List[str] = []
+    seen = set()
+    for name in role_names:
+        key = name.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            distinct_roles.append(name.strip())
+
+    slots = asyncio.Semaphore(settings.SKILL_GAP_BATCH_CONCURRENCY)
+    resume_text = resume.extracted_text
+
+    async def _run(role_name: str) -> SkillGapBatchItem:
+        async with slots:
+            try:
+                return await _analyze_role_for_batch(
+                    user, resume.id, resume_text, role_name, learning_preference
+                )
+            except Exception as e:
+                # e.g. a DB error loading or saving the analysis: only this
+                # role fails, the others keep their results
+                print(f"Batch analysis failed for role '{role_name}': {e}")
+                return SkillGapBatchItem(
+                    role_name=role_name,
+                    error=f"Failed to analyze role: {str(e)}"
+                )
+
+    return await asyncio.gather(*(_run(role_name) for role_name in distinct_roles))
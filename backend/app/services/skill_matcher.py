@@ -0,0 +1,219 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.schemas.skill_gap import SkillGapItem, SkillMatchPreview
+
+# Finds target skills that literally appear in a resume, so the obvious
+# matches don't have to be decided (and written out) by Gemini.
+#
+# All of a role's skill names and their aliases are compiled into one
+# Aho-Corasick automaton, which scans the resume once no matter how many
+# skills there are.
+
+# Canonical skill -> other ways resumes commonly write it (all lowercase)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": [],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs", "react js"],
+    "vue.js": ["vue", "vuejs", "vue js"],
+    "angular": ["angularjs", "angular.js"],
+    "next.js": ["nextjs", "next js"],
+    "postgresql": ["postgres", "psql"],
+    "mongodb": ["mongo"],
+    "kubernetes": ["k8s"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "ci/cd": ["cicd", "ci / cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "rest apis": ["rest", "rest api", "restful", "restful apis", "restful api"],
+    "machine learning": ["ml"],
+    "c#": ["csharp", "c sharp"],
+    "c++": ["cpp"],
+    ".net": ["dotnet", "asp.net"],
+    "go": ["golang"],
+    "python": [],
+    "sql": [],
+    "html": ["html5"],
+    "css": ["css3"],
+    "docker": [],
+    "git": [],
+    "graphql": [],
+    "terraform": [],
+}
+
+# Skill names and aliases that are also ordinary words ("go to market",
+# "R&D", "the rest of the year", "react quickly"). They are only matched
+# through their other aliases, if any, unless listed in
+# CASE_SENSITIVE_TERMS. A wrong local match is forced to 'Matched' and the
+# model never sees the skill, so these err on the side of not matching.
+AMBIGUOUS_TERMS = {"go", "r", "c", "d", "rest", "react", "node", "ml"}
+
+# Ambiguous terms that do count when written exactly like this
+CASE_SENSITIVE_TERMS: Dict[str, str] = {
+    "rest": "REST",
+    "ml": "ML",
+}
+
+# Soft skills ("Communication", "Teamwork") appearing in a resume says
+# little, so only technical skills are pre-classified locally.
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string search: finds every occurrence of any of the
+    patterns in a single pass over the text.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_fail_links()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yields (start index, pattern) for every occurrence in text."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                yield index - len(pattern) + 1, pattern
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _terms_for_skill(skill: str) -> List[str]:
+    """The lowercase terms that count as a mention of a skill."""
+    name = " ".join(skill.lower().split())
+    terms = {name}
+
+    # Look the skill up both as a canonical name and as an alias
+    for canonical, aliases in SKILL_ALIASES.items():
+        if name == canonical or name in aliases:
+            terms.add(canonical)
+            terms.update(aliases)
+
+    return sorted(
+        term for term in terms
+        if term not in AMBIGUOUS_TERMS or term in CASE_SENSITIVE_TERMS
+    )
+
+
+class SkillMatcher:
+    """A compiled index of one role's skills, reusable across resumes."""
+
+    def __init__(self, skills: Tuple[str, ...]):
+        self.skills = skills
+        self._skills_by_term: Dict[str, List[str]] = {}
+        for skill in skills:
+            for term in _terms_for_skill(skill):
+                self._skills_by_term.setdefault(term, []).append(skill)
+        self._automaton = AhoCorasick(self._skills_by_term)
+
+    def find(self, text: str) -> Dict[str, str]:
+        """Returns {skill: term found} for every skill mentioned in text."""
+        lowered = text.lower()
+        # Case-sensitive terms are checked against the original text, which
+        # lines up with the lowered one unless lower() changed its length
+        same_offsets = len(lowered) == len(text)
+        found: Dict[str, str] = {}
+        for start, term in self._automaton.find_all(lowered):
+            end = start + len(term)
+            # Whole words only: "java" must not match inside "javascript"
+            if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(term[0]):
+                continue
+            if end < len(lowered) and _is_word_char(lowered[end]) and _is_word_char(term[-1]):
+                continue
+            required_spelling = CASE_SENSITIVE_TERMS.get(term)
+            if required_spelling and not (same_offsets and text[start:end] == required_spelling):
+                continue
+            for skill in self._skills_by_term[term]:
+                found.setdefault(skill, term)
+        return found
+
+
+@lru_cache(maxsize=256)
+def get_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    """Returns the compiled matcher for a set of skills, building it once."""
+    return SkillMatcher(skills)
+
+
+def pre_classify(
+    resume_text: str,
+    technical_skills: List[str],
+    soft_skills: List[str]
+) -> Tuple[List[SkillGapItem], List[str]]:
+    """
+    Splits a role's skills into those found in the resume (returned as
+    'Matched' items) and those left for the model to judge.
+    """
+    found = get_matcher(tuple(technical_skills)).find(resume_text)
+
+    matched_items = [
+        SkillGapItem(
+            skill_name=skill,
+            match_status="Matched",
+            justification=f"Matched: '{found[skill]}' appears in the resume.",
+            learning_plan=None
+        )
+        for skill in technical_skills if skill in found
+    ]
+    unresolved = [skill for skill in technical_skills if skill not in found] + list(soft_skills)
+    return matched_items, unresolved
+
+
+def preview(
+    resume_text: str,
+    technical_skills: List[str],
+    soft_skills: List[str]
+) -> SkillMatchPreview:
+    """
+    Instant, local estimate of the match score: the share of the role's
+    technical skills found verbatim in the resume. Soft skills are never
+    matched locally, so they're left out of the score (and listed as
+    unresolved). No model call.
+    """
+    matched_items, unresolved = pre_classify(resume_text, technical_skills, soft_skills)
+    total = len(technical_skills)
+    score = round(100.0 * len(matched_items) / total, 1) if total else 0.0
+    return SkillMatchPreview(
+        skill_match_score=score,
+        matched_skills=[item.skill_name for item in matched_items],
+        unresolved_skills=unresolved
+    )
@@ -2,16 +2,44 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.models import User
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import get_password_hash_async
+
+# Authenticated users, keyed by email. Entries are detached from any session.
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     """Fetches a single user by their email address."""
     result = await db.execute(select(User).filter(User.email == email))
     return result.scalars().first()
 
+async def get_user_by_email_cached(db: AsyncSession, email: str) -> User | None:
+    """
+    Like get_user_by_email, but served from a short-lived per-worker cache.
+    Use it for authentication only; the returned user is detached.
+    """
+    user = _user_cache.get(email)
+    if user is not None:
+        return user
+
+    user = await get_user_by_email(db, email=email)
+    if user is not None:
+        # Detach it so requests sharing the cached object don't share a session
+        db.expunge(user)
+        _user_cache.set(email, user)
+    return user
+
+def invalidate_cached_user(email: str) -> None:
+    """Drops a user from the cache. Call it whenever a user row changes."""
+    _user_cache.invalidate(email)
+
 async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
-    """Creates a new user in the database."""
-    hashed_password = get_password_hash(user_create.password)
+    """
+    Creates a new user in the database.
+    Raises PasswordHasherOverloaded if the hash pool is saturated.
+    """
+    hashed_password = await get_password_hash_async(user_create.password)
     db_user = User(
         email=user_create.email,
         hashed_password=hashed_password
@@ -19,4 +47,5 @@ async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    invalidate_cached_user(db_user.email)
     return db_user
\ No newline at end of file
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.http_client import warm_http_client
+from app.db.database import async_session, warm_pool
+from app.services import gemini_gateway, role_service
+
+# Startup warm-up. It runs as a background task once the server is up, so
+# liveness checks answer right away, while /ready stays 503 until every
+# step has finished (or failed, or WARMUP_TIMEOUT_SECONDS has passed) and
+# Cloud Run only routes traffic to a warm instance. A failed step is
+# logged and doesn't keep the instance out of rotation: the first
+# requests just pay for it, as they would without warm-up.
+
+WARMUP_STEP_SECONDS = metrics.gauge(
+    "warmup_step_seconds",
+    "Time each startup warm-up step took.",
+    labelnames=("step", "outcome")
+)
+WARMUP_READY = metrics.gauge(
+    "warmup_ready",
+    "1 once startup warm-up has finished."
+)
+
+_task: asyncio.Task | None = None
+_ready = asyncio.Event()
+_started_at: float | None = None
+_finished_at: float | None = None
+_steps: Dict[str, Dict[str, Any]] = {}
+
+
+async def _warm_db_pool() -> int:
+    return await warm_pool(settings.WARMUP_DB_CONNECTIONS)
+
+
+async def _warm_role_profiles() -> int:
+    async with async_session() as db:
+        return await role_service.preload_profile_cache(db, settings.WARMUP_ROLE_PROFILES)
+
+
+async def _warm_http() -> int:
+    urls = [settings.ARBEITNOW_API_URL] + gemini_gateway.warmup_urls()
+    return await warm_http_client(urls)
+
+
+async def _warm_gemini_models() -> None:
+    # The SDK import is CPU-bound; a thread keeps /ready and /metrics responsive
+    await asyncio.to_thread(gemini_gateway.warm_models)
+
+
+def _enabled_steps() -> Dict[str, Callable[[], Awaitable[Any]]]:
+    steps = {}
+    if settings.WARMUP_DB_CONNECTIONS > 0:
+        steps["db_pool"] = _warm_db_pool
+    if settings.WARMUP_ROLE_PROFILES > 0:
+        steps["role_profiles"] = _warm_role_profiles
+    if settings.WARMUP_HTTP:
+        steps["http"] = _warm_http
+    if settings.WARMUP_GEMINI_MODELS:
+        steps["gemini_models"] = _warm_gemini_models
+    return steps
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Any]]) -> None:
+    start = time.perf_counter()
+    _steps[name] = {"status": "running"}
+    try:
+        result = await step()
+    except Exception as e:
+        outcome = "error"
+        print(f"Warm-up step '{name}' failed: {e}")
+        _steps[name] = {"status": outcome, "error": str(e)}
+    else:
+        outcome = "ok"
+        _steps[name] = {"status": outcome, "result": result}
+    elapsed = time.perf_counter() - start
+    _steps[name]["seconds"] = round(elapsed, 3)
+    WARMUP_STEP_SECONDS.set(elapsed, step=name, outcome=outcome)
+
+
+async def _run_warmup() -> None:
+    global _finished_at
+    steps = _enabled_steps()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(_run_step(name, step) for name, step in steps.items())),
+            timeout=settings.WARMUP_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        for name, state in _steps.items():
+            if state["status"] == "running":
+                state["status"] = "timeout"
+        print(f"Warm-up timed out after {settings.WARMUP_TIMEOUT_SECONDS}s; reporting ready anyway.")
+    finally:
+        _finished_at = time.perf_counter()
+        _ready.set()
+        WARMUP_READY.set(1)
+
+
+def start_warmup() -> None:
+    """Starts the warm-up task on the running event loop."""
+    global _task, _started_at, _finished_at
+    _ready.clear()
+    _steps.clear()
+    WARMUP_READY.set(0)
+    _started_at = time.perf_counter()
+    _finished_at = None
+    _task = asyncio.create_task(_run_warmup())
+
+
+async def stop_warmup() -> None:
+    """Cancels the warm-up task if it's still running."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    """Readiness plus the state of each warm-up step."""
+    elapsed = None
+    if _started_at is not None:
+        elapsed = round((_finished_at or time.perf_counter()) - _started_at, 3)
+    return {
+        "ready": is_ready(),
+        "elapsed_seconds": elapsed,
+        "steps": {name: dict(state) for name, state in _steps.items()},
+    }
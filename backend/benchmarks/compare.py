@@ -0,0 +1,68 @@
+"""
+Compares two load-test result files (from benchmarks.run or loadgen).
+
+    python -m benchmarks.compare results/base.json results/new.json --max-regression 10
+
+Prints per-endpoint throughput and latency percentiles side by side, and
+exits with status 1 if any endpoint's p95 got worse by more than
+--max-regression percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate")
+
+
+def _change(base: float, new: float) -> float | None:
+    if not base:
+        return None
+    return (new - base) / base * 100
+
+
+def compare(base: dict, new: dict, max_regression: float) -> list:
+    """Prints the comparison and returns the endpoints whose p95 regressed."""
+    regressions = []
+    base_meta, new_meta = base.get("meta", {}), new.get("meta", {})
+    print(f"base: {base_meta.get('commit', '?')} {base_meta.get('label', '')}")
+    print(f"new:  {new_meta.get('commit', '?')} {new_meta.get('label', '')}\n")
+    if base.get("config") != new.get("config"):
+        print("warning: the runs used different load settings\n")
+
+    print(f"{'endpoint':<10} {'metric':<15} {'base':>10} {'new':>10} {'change':>9}")
+    for name in sorted(set(base["endpoints"]) | set(new["endpoints"])):
+        base_stats = base["endpoints"].get(name)
+        new_stats = new["endpoints"].get(name)
+        if base_stats is None or new_stats is None:
+            print(f"{name:<10} only in {'new' if base_stats is None else 'base'}")
+            continue
+        for metric in METRICS:
+            change = _change(base_stats[metric], new_stats[metric])
+            change_text = f"{change:+8.1f}%" if change is not None else "       -"
+            print(f"{name:<10} {metric:<15} {base_stats[metric]:>10.2f} {new_stats[metric]:>10.2f} {change_text}")
+        p95_change = _change(base_stats["p95_ms"], new_stats["p95_ms"])
+        if p95_change is not None and p95_change > max_regression:
+            regressions.append(name)
+        print()
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Allowed p95 increase per endpoint, in percent")
+    args = parser.parse_args()
+
+    regressions = compare(
+        json.loads(args.base.read_text()), json.loads(args.new.read_text()), args.max_regression
+    )
+    if regressions:
+        print(f"p95 regressed by more than {args.max_regression:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
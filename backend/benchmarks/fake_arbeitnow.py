@@ -0,0 +1,149 @@
+"""
+Local stand-in for the Arbeitnow job board API, for load tests.
+
+Serves /api/job-board-api?query=...&page=... with generated HTML job
+postings, ETags (answering If-None-Match with 304) and a configurable
+delay, error rate and description size. Run the app with
+ARBEITNOW_API_URL=http://127.0.0.1:8102/api/job-board-api.
+
+    python -m benchmarks.fake_arbeitnow --port 8102 --latency-ms 300 --pages 5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+SENTENCES = [
+    "You will design, build and operate services used by thousands of customers.",
+    "You work closely with design and product to ship features end to end.",
+    "Experience with {skill} in production is required.",
+    "Familiarity with {skill} is a strong plus.",
+    "You care about testing, code review and observability.",
+    "You have shipped and maintained {skill} code for several years.",
+    "You will mentor other engineers and help raise the bar on quality.",
+    "Our stack includes {skill}, {skill2} and a lot of automation.",
+    "You are comfortable owning problems from the first sketch to production.",
+    "Nice to have: experience with {skill2} or similar tools.",
+    "You communicate clearly in writing and in person.",
+    "You will help us migrate legacy systems to {skill}.",
+]
+SKILLS = [
+    "Python", "React", "TypeScript", "PostgreSQL", "Docker", "Kubernetes", "AWS",
+    "Go", "Java", "GraphQL", "Redis", "Terraform", "Node.js", "FastAPI",
+]
+BOILERPLATE = (
+    "<p>We are an equal opportunity employer and value diversity. "
+    "Apply now via our careers page.</p>"
+)
+OTHER_TITLES = ["Sales Manager", "Office Assistant", "Account Executive", "Recruiter"]
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0 # Fraction of requests answered with 500
+    pages: int = 5 # Pages before links.next is null
+    jobs_per_page: int = 100 # The real API returns 100
+    match_rate: float = 0.2 # Fraction of jobs whose title contains the query
+    description_chars: int = 3000
+    seed: int = 1
+
+
+config = FakeConfig()
+rng = random.Random(config.seed)
+app = FastAPI(title="Fake Arbeitnow")
+
+
+def _page(query: str, page: int) -> dict:
+    # Deterministic per (query, page), so ETags are stable across requests
+    page_rng = random.Random(f"{query.lower()}|{page}")
+    jobs = []
+    for index in range(config.jobs_per_page):
+        if page_rng.random() < config.match_rate:
+            title = f"Senior {query.title()}"
+        else:
+            title = page_rng.choice(OTHER_TITLES)
+        # Different sentences per posting, so they aren't dropped as reposts
+        paragraphs = []
+        length = 0
+        while length < config.description_chars:
+            sentences = page_rng.sample(SENTENCES, 4)
+            paragraph = "<p>" + " ".join(
+                sentence.format(skill=page_rng.choice(SKILLS), skill2=page_rng.choice(SKILLS))
+                for sentence in sentences
+            ) + "</p>"
+            paragraphs.append(paragraph)
+            length += len(paragraph)
+        body = "".join(paragraphs)
+        jobs.append({
+            "slug": f"{query.lower().replace(' ', '-')}-{page}-{index}",
+            "company_name": f"Company {page_rng.randint(1, 500)}",
+            "title": title,
+            "description": f"<h2>{title}</h2>{body}{BOILERPLATE}",
+            "remote": page_rng.random() < 0.5,
+            "tags": [],
+            "location": "Berlin",
+        })
+    has_next = page < config.pages
+    return {
+        "data": jobs,
+        "links": {"next": f"?page={page + 1}" if has_next else None},
+        "meta": {"current_page": page},
+    }
+
+
+@app.get("/api/job-board-api")
+async def job_board(request: Request, query: str = "", page: int = 1):
+    await asyncio.sleep(max(rng.gauss(config.latency_ms, config.jitter_ms), 0.0) / 1000)
+    if rng.random() < config.error_rate:
+        return JSONResponse({"message": "Internal Server Error"}, status_code=500)
+
+    if page > config.pages:
+        payload = {"data": [], "links": {"next": None}, "meta": {"current_page": page}}
+    else:
+        payload = _page(query, page)
+    content = json.dumps(payload).encode()
+    etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content, media_type="application/json", headers={"ETag": etag})
+
+
+def main() -> None:
+    global rng
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--pages", type=int, default=config.pages)
+    parser.add_argument("--jobs-per-page", type=int, default=config.jobs_per_page)
+    parser.add_argument("--match-rate", type=float, default=config.match_rate)
+    parser.add_argument("--description-chars", type=int, default=config.description_chars)
+    parser.add_argument("--seed", type=int, default=config.seed)
+    args = parser.parse_args()
+
+    config.latency_ms = args.latency_ms
+    config.jitter_ms = args.jitter_ms
+    config.error_rate = args.error_rate
+    config.pages = args.pages
+    config.jobs_per_page = args.jobs_per_page
+    config.match_rate = args.match_rate
+    config.description_chars = args.description_chars
+    config.seed = args.seed
+    rng = random.Random(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Local stand-in for the Gemini REST API, for load tests.
+
+Serves generateContent and streamGenerateContent (SSE) with canned,
+schema-valid answers to the app's three prompts (role profile, skill gap,
+optimize) after a configurable delay. Run the app with
+GEMINI_TRANSPORT=rest and GEMINI_API_BASE_URL pointing here.
+
+    python -m benchmarks.fake_gemini --port 8101 --latency-ms 800 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TECHNICAL_SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "PostgreSQL",
+    "Docker", "Kubernetes", "AWS", "REST APIs", "GraphQL", "Git", "CI/CD",
+    "Redis", "FastAPI", "Django", "Java", "Go", "Terraform",
+]
+SOFT_SKILLS = ["Communication", "Teamwork", "Problem Solving", "Ownership", "Mentoring"]
+FILLER = (
+    "Delivered measurable results across cross-functional teams while improving "
+    "reliability, performance and developer experience. "
+)
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 800.0 # Mean time to answer
+    jitter_ms: float = 200.0 # Standard deviation of the delay
+    error_rate: float = 0.0 # Fraction of requests answered with 503
+    rate_limit_rate: float = 0.0 # Fraction of requests answered with 429
+    payload_chars: int = 2000 # Approximate size of free-text fields
+    stream_chunks: int = 8
+    seed: int = 1
+
+
+config = FakeConfig()
+rng = random.Random(config.seed)
+app = FastAPI(title="Fake Gemini")
+
+
+def _filler(chars: int) -> str:
+    return (FILLER * (chars // len(FILLER) + 1))[:max(chars, 1)]
+
+
+def _role_profile(prompt: str) -> str:
+    match = re.search(r"for a '(.+?)' position", prompt)
+    role = match.group(1) if match else "Software Engineer"
+    # Same role -> same skills, so repeated runs are comparable
+    role_rng = random.Random(role.lower())
+    return json.dumps({
+        "ideal_profile_summary": f"The ideal {role} " + _filler(config.payload_chars // 4),
+        "top_technical_skills": role_rng.sample(TECHNICAL_SKILLS, 8),
+        "top_soft_skills": role_rng.sample(SOFT_SKILLS, 3),
+    })
+
+
+def _skill_gap(prompt: str) -> str:
+    match = re.search(r"\*\*KEY TARGET SKILLS for .*?:\*\*\s*\n\s*(.*)", prompt)
+    skills = [] if not match or match.group(1).strip() == "(none)" else [
+        skill.strip() for skill in match.group(1).split(",") if skill.strip()
+    ]
+    items = []
+    for skill in skills:
+        status = rng.choice(["Matched", "Partial", "Missing"])
+        items.append({
+            "skill_name": skill,
+            "match_status": status,
+            "justification": f"{status}: " + _filler(120),
+            "learning_plan": None if status == "Matched" else [
+                {
+                    "step_title": f"Step {step} for {skill}",
+                    "estimated_hours": float(step * 4),
+                    "details": _filler(160),
+                }
+                for step in range(1, 4)
+            ],
+        })
+    return json.dumps({
+        "skill_match_score": round(rng.uniform(30, 90), 1),
+        "analysis_summary": _filler(config.payload_chars // 4),
+        "skill_comparison": items,
+    })
+
+
+def _answer(prompt: str, json_mode: bool) -> str:
+    if json_mode and "Ideal Candidate Profile" in prompt and "Job Descriptions:" in prompt:
+        return _role_profile(prompt)
+    if json_mode:
+        return _skill_gap(prompt)
+    return _filler(config.payload_chars)
+
+
+def _response_payload(text: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+        }],
+    }
+
+
+def _delay_seconds() -> float:
+    return max(rng.gauss(config.latency_ms, config.jitter_ms), 0.0) / 1000
+
+
+def _injected_error() -> JSONResponse | None:
+    roll = rng.random()
+    if roll < config.error_rate:
+        return JSONResponse({"error": {"code": 503, "status": "UNAVAILABLE"}}, status_code=503)
+    if roll < config.error_rate + config.rate_limit_rate:
+        return JSONResponse({"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}, status_code=429)
+    return None
+
+
+async def _read_prompt(request: Request) -> tuple[str, bool]:
+    body = await request.json()
+    prompt = "".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    json_mode = (body.get("generationConfig") or {}).get("responseMimeType") == "application/json"
+    return prompt, json_mode
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    prompt, json_mode = await _read_prompt(request)
+    await asyncio.sleep(_delay_seconds())
+    error = _injected_error()
+    if error is not None:
+        return error
+    return _response_payload(_answer(prompt, json_mode))
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def stream_generate_content(model: str, request: Request):
+    prompt, json_mode = await _read_prompt(request)
+    error = _injected_error()
+    if error is not None:
+        return error
+
+    text = _answer(prompt, json_mode)
+    chunk_count = max(config.stream_chunks, 1)
+    chunk_size = len(text) // chunk_count + 1
+    chunk_delay = _delay_seconds() / chunk_count
+
+    async def events():
+        for start in range(0, len(text), chunk_size):
+            await asyncio.sleep(chunk_delay)
+            yield f"data: {json.dumps(_response_payload(text[start:start + chunk_size]))}\r\n\r\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main() -> None:
+    global rng
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate)
+    parser.add_argument("--payload-chars", type=int, default=config.payload_chars)
+    parser.add_argument("--stream-chunks", type=int, default=config.stream_chunks)
+    parser.add_argument("--seed", type=int, default=config.seed)
+    args = parser.parse_args()
+
+    config.latency_ms = args.latency_ms
+    config.jitter_ms = args.jitter_ms
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.payload_chars = args.payload_chars
+    config.stream_chunks = args.stream_chunks
+    config.seed = args.seed
+    rng = random.Random(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
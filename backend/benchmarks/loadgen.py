@@ -0,0 +1,302 @@
+"""
+Mixed-traffic load driver for the SkillSync API.
+
+Each virtual user registers, logs in and uploads a resume, then loops
+until the deadline picking one operation at a time by weight:
+
+    login, upload, history, analyze, optimize
+
+and records the latency and status of every request. The random choices
+are seeded, so two runs with the same arguments send the same mix.
+
+    python -m benchmarks.loadgen --base-url http://127.0.0.1:8100 --users 20 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+DEFAULT_MIX = "login=1,upload=1,history=4,analyze=3,optimize=1"
+DEFAULT_RESUME = Path(__file__).resolve().parent.parent / "my_resume.pdf"
+ROLES = [
+    "React Developer", "Backend Engineer", "Data Engineer",
+    "DevOps Engineer", "Python Developer", "Frontend Engineer",
+]
+LEARNING_PREFERENCES = ["Coding Projects", "Video Courses", "Reading / Docs"]
+PASSWORD = "bench-password-123"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parses "login=1,history=4" into {"login": 1.0, "history": 4.0}."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {sorted(unknown)}")
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Recorder:
+    """Collects (latency, ok) samples per operation."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, seconds: float, status: str) -> None:
+        ok = status.isdigit() and 200 <= int(status) < 300
+        self.samples[operation].append((seconds, ok))
+        self.statuses[operation][status] += 1
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        endpoints = {}
+        for operation in sorted(self.samples):
+            samples = self.samples[operation]
+            latencies = sorted(seconds * 1000 for seconds, _ in samples)
+            errors = sum(1 for _, ok in samples if not ok)
+            endpoints[operation] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": errors / len(samples),
+                "throughput_rps": len(samples) / duration,
+                "mean_ms": sum(latencies) / len(latencies),
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": latencies[-1],
+                "statuses": dict(self.statuses[operation]),
+            }
+        return endpoints
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random,
+                 resume_pdf: bytes, duplicate_upload_rate: float):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.resume_pdf = resume_pdf
+        self.duplicate_upload_rate = duplicate_upload_rate
+        self.email = f"bench-{uuid.UUID(int=rng.getrandbits(128))}@example.com"
+        self.token: str | None = None
+        self.resume_ids: List[int] = []
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def _timed(self, operation: str, request) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            self.recorder.record(operation, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.recorder.record(operation, time.perf_counter() - start, str(response.status_code))
+        return response
+
+    async def setup(self) -> None:
+        """Registers, logs in and uploads one resume (not recorded)."""
+        response = await self.client.post(
+            "/auth/register", json={"email": self.email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        self.token = response.json()["access_token"]
+        response = await self.client.post(
+            "/resume/upload", headers=self.headers, files=self._resume_file(unique=True)
+        )
+        response.raise_for_status()
+        self.resume_ids.append(response.json()["resume_id"])
+
+    def _resume_file(self, unique: bool) -> dict:
+        data = self.resume_pdf
+        if unique:
+            # Bytes after %%EOF are ignored by PDF readers but change the hash,
+            # so the upload isn't answered from the duplicate-file shortcut
+            data += f"\n% {self.rng.getrandbits(64):x}\n".encode()
+        return {"file": ("resume.pdf", data, "application/pdf")}
+
+    async def login(self) -> None:
+        response = await self._timed("login", self.client.post(
+            "/auth/login", data={"username": self.email, "password": PASSWORD}
+        ))
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def upload(self) -> None:
+        unique = self.rng.random() >= self.duplicate_upload_rate
+        response = await self._timed("upload", self.client.post(
+            "/resume/upload", headers=self.headers, files=self._resume_file(unique)
+        ))
+        if response is not None and response.status_code == 201:
+            resume_id = response.json()["resume_id"]
+            if resume_id not in self.resume_ids:
+                self.resume_ids.append(resume_id)
+
+    async def history(self) -> None:
+        await self._timed("history", self.client.get("/resume/history/page", headers=self.headers))
+
+    async def analyze(self) -> None:
+        await self._timed("analyze", self.client.post(
+            "/skill-gap/analyze",
+            headers=self.headers,
+            json={
+                "resume_id": self.rng.choice(self.resume_ids),
+                "role_name": self.rng.choice(ROLES),
+                "learning_preference": self.rng.choice(LEARNING_PREFERENCES),
+            }
+        ))
+
+    async def optimize(self) -> None:
+        await self._timed("optimize", self.client.post(
+            "/resume/optimize",
+            headers=self.headers,
+            json={
+                "resume_id": self.rng.choice(self.resume_ids),
+                "role_name": self.rng.choice(ROLES),
+            }
+        ))
+
+
+OPERATIONS = {
+    "login": VirtualUser.login,
+    "upload": VirtualUser.upload,
+    "history": VirtualUser.history,
+    "analyze": VirtualUser.analyze,
+    "optimize": VirtualUser.optimize,
+}
+
+
+async def run_load(
+    base_url: str,
+    users: int = 10,
+    duration: float = 60.0,
+    mix: str = DEFAULT_MIX,
+    seed: int = 1,
+    think_ms: float = 0.0,
+    resume_path: Path = DEFAULT_RESUME,
+    duplicate_upload_rate: float = 0.2,
+    timeout: float = 180.0
+) -> dict:
+    """Runs the load and returns the results (see write_results)."""
+    weights = parse_mix(mix)
+    names = list(weights)
+    resume_pdf = Path(resume_path).read_bytes()
+    recorder = Recorder()
+
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        vusers = [
+            VirtualUser(client, recorder, random.Random(f"{seed}-{index}"), resume_pdf,
+                        duplicate_upload_rate)
+            for index in range(users)
+        ]
+        await asyncio.gather(*(vuser.setup() for vuser in vusers))
+
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def _loop(vuser: VirtualUser) -> None:
+            while time.perf_counter() < deadline:
+                operation = vuser.rng.choices(names, weights=[weights[name] for name in names])[0]
+                await OPERATIONS[operation](vuser)
+                if think_ms:
+                    await asyncio.sleep(vuser.rng.expovariate(1000 / think_ms))
+
+        await asyncio.gather(*(_loop(vuser) for vuser in vusers))
+        elapsed = time.perf_counter() - started
+
+    endpoints = recorder.summary(elapsed)
+    total_requests = sum(stats["requests"] for stats in endpoints.values())
+    return {
+        "config": {
+            "base_url": base_url,
+            "users": users,
+            "duration": duration,
+            "mix": weights,
+            "seed": seed,
+            "think_ms": think_ms,
+            "resume": str(resume_path),
+            "duplicate_upload_rate": duplicate_upload_rate,
+        },
+        "elapsed_seconds": elapsed,
+        "total": {
+            "requests": total_requests,
+            "errors": sum(stats["errors"] for stats in endpoints.values()),
+            "throughput_rps": total_requests / elapsed,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(results: dict) -> None:
+    header = f"{'endpoint':<10} {'reqs':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:<10} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% "
+            f"{stats['throughput_rps']:>7.2f} {stats['p50_ms']:>7.0f}ms {stats['p95_ms']:>7.0f}ms "
+            f"{stats['p99_ms']:>7.0f}ms {stats['max_ms']:>7.0f}ms"
+        )
+    total = results["total"]
+    print(f"\n{total['requests']} requests, {total['errors']} errors, "
+          f"{total['throughput_rps']:.2f} req/s over {results['elapsed_seconds']:.1f}s")
+
+
+def write_results(results: dict, output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of measured load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--resume", type=Path, default=DEFAULT_RESUME, help="PDF to upload")
+    parser.add_argument("--duplicate-upload-rate", type=float, default=0.2,
+                        help="Fraction of uploads that repeat an earlier file byte for byte")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON here")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8100")
+    add_load_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(
+        args.base_url, users=args.users, duration=args.duration, mix=args.mix,
+        seed=args.seed, think_ms=args.think_ms, resume_path=args.resume,
+        duplicate_upload_rate=args.duplicate_upload_rate
+    ))
+    print_report(results)
+    if args.output:
+        write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Generates the synthetic resume corpus for the PDF extraction benchmark.
+
+The PDFs are written by hand (raw PDF syntax, no PDF library), so the
+corpus is the same on every machine and doesn't depend on the extractor
+under test. Documents vary in what makes extraction expensive: page
+count (1-50), two-column layouts, many fonts with ToUnicode maps and
+large embedded font programs, and image-only (scanned) pages.
+
+    python -m benchmarks.pdf_corpus --out benchmarks/pdf_corpus
+"""
+import argparse
+import random
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 13
+
+BASE_FONTS = ["Helvetica", "Times-Roman", "Courier", "Helvetica-Bold", "Times-Bold", "Courier-Oblique"]
+WORDS = (
+    "designed built shipped scaled migrated automated led mentored reduced improved "
+    "latency throughput reliability platform service pipeline dashboard customers "
+    "python react typescript postgres docker kubernetes aws terraform graphql redis "
+    "team product roadmap incident on-call observability testing deployment api "
+    "microservices data analytics revenue growth performance security compliance"
+).split()
+_LIGHT_GRAY = bytes(value | 0xC0 for value in range(256))
+SECTIONS = ["Summary", "Experience", "Projects", "Skills", "Education", "Certifications"]
+
+
+@dataclass(frozen=True)
+class DocumentSpec:
+    name: str
+    pages: int
+    columns: int = 1 # 1 or 2
+    fonts: int = 1 # Distinct fonts, switched between every few lines
+    embedded_font_kb: int = 0 # Size of the fake embedded font program per font
+    image_every: int = 0 # Every Nth page is a scanned image with no text (0 = never)
+    image_size: int = 0 # Image width/height in pixels
+    seed: int = 1
+
+
+# The corpus: names are stable, so results can be compared across runs
+CORPUS: List[DocumentSpec] = [
+    DocumentSpec("p01_simple", pages=1),
+    DocumentSpec("p02_two_column", pages=2, columns=2),
+    DocumentSpec("p03_many_fonts", pages=3, fonts=6, embedded_font_kb=64),
+    DocumentSpec("p05_mixed_scans", pages=5, image_every=2, image_size=600),
+    DocumentSpec("p10_two_column_fonts", pages=10, columns=2, fonts=4, embedded_font_kb=32),
+    DocumentSpec("p20_simple", pages=20),
+    DocumentSpec("p30_heavy", pages=30, columns=2, fonts=6, embedded_font_kb=128, image_every=5, image_size=800),
+    DocumentSpec("p50_simple", pages=50),
+    DocumentSpec("p50_heavy", pages=50, columns=2, fonts=6, embedded_font_kb=128, image_every=4, image_size=1000),
+    DocumentSpec("p03_scanned_only", pages=3, image_every=1, image_size=1200),
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 12))]
+    return " ".join(words).capitalize() + "."
+
+
+def _column_lines(rng: random.Random, width_chars: int) -> List[str]:
+    """Lines of resume-like text for one column of one page."""
+    lines: List[str] = []
+    max_lines = (PAGE_HEIGHT - 100) // LINE_HEIGHT
+    while len(lines) < max_lines:
+        if rng.random() < 0.12:
+            lines.append(rng.choice(SECTIONS).upper())
+            continue
+        line = "- " + _sentence(rng)
+        while len(line) > width_chars:
+            cut = line.rfind(" ", 0, width_chars)
+            lines.append(line[:cut])
+            line = "  " + line[cut + 1:]
+        lines.append(line)
+    return lines[:max_lines]
+
+
+def _text_content(spec: DocumentSpec, rng: random.Random) -> bytes:
+    columns = [(50, 90)] if spec.columns == 1 else [(50, 44), (320, 44)]
+    ops: List[str] = []
+    for x, width_chars in columns:
+        ops.append("BT")
+        ops.append(f"1 0 0 1 {x} {PAGE_HEIGHT - 60} Tm")
+        font_index = 0
+        for line_number, line in enumerate(_column_lines(rng, width_chars)):
+            if line_number % 4 == 0:
+                font_index = (font_index + 1) % spec.fonts
+                ops.append(f"/F{font_index + 1} 10 Tf")
+            ops.append(f"0 -{LINE_HEIGHT} Td ({_escape(line)}) Tj")
+        ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _image_data(spec: DocumentSpec, rng: random.Random) -> bytes:
+    # Noisy light-gray "scan": compresses about as badly as a real one
+    noise = rng.randbytes(spec.image_size * spec.image_size)
+    return zlib.compress(noise.translate(_LIGHT_GRAY), 6)
+
+
+def _to_unicode_cmap() -> bytes:
+    return (
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+        "1 begincodespacerange <00> <FF> endcodespacerange\n"
+        "1 beginbfrange <20> <7E> <0020> endbfrange\n"
+        "endcmap CMapName currentdict /CMap defineresource pop end end"
+    ).encode()
+
+
+class _PdfWriter:
+    def __init__(self):
+        self.objects: List[bytes | None] = []
+
+    def reserve(self) -> int:
+        self.objects.append(None)
+        return len(self.objects)
+
+    def set(self, number: int, body: bytes) -> None:
+        self.objects[number - 1] = body
+
+    def add(self, body: bytes) -> int:
+        self.objects.append(body)
+        return len(self.objects)
+
+    def add_stream(self, data: bytes, extra: str = "", compress: bool = True) -> int:
+        if compress:
+            data = zlib.compress(data, 6)
+            extra += " /Filter /FlateDecode"
+        header = f"<< /Length {len(data)}{extra} >>\nstream\n".encode()
+        return self.add(header + data + b"\nendstream")
+
+    def render(self, root: int) -> bytes:
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self.objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref_at = len(out)
+        out += f"xref\n0 {len(self.objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {len(self.objects) + 1} /Root {root} 0 R >>\n".encode()
+        out += f"startxref\n{xref_at}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+def build_pdf(spec: DocumentSpec) -> bytes:
+    """Builds one corpus document."""
+    rng = random.Random(f"{spec.name}|{spec.seed}")
+    writer = _PdfWriter()
+    catalog = writer.reserve()
+    pages_root = writer.reserve()
+
+    # Fonts, shared by all pages
+    font_refs: Dict[str, int] = {}
+    to_unicode = writer.add_stream(_to_unicode_cmap())
+    for index in range(spec.fonts):
+        base_font = BASE_FONTS[index % len(BASE_FONTS)]
+        entries = f"/Type /Font /Subtype /Type1 /BaseFont /{base_font} /ToUnicode {to_unicode} 0 R"
+        entries += " /FirstChar 32 /LastChar 126 /Widths [" + " ".join(
+            str(500 + (code * 7 + index) % 120) for code in range(32, 127)
+        ) + "]"
+        if spec.embedded_font_kb:
+            program = rng.randbytes(spec.embedded_font_kb * 1024)
+            font_file = writer.add_stream(program, f" /Length1 {len(program)}", compress=False)
+            descriptor = writer.add(
+                f"<< /Type /FontDescriptor /FontName /{base_font} /Flags 32 "
+                f"/FontBBox [-166 -225 1000 931] /ItalicAngle 0 /Ascent 718 /Descent -207 "
+                f"/CapHeight 718 /StemV 88 /FontFile {font_file} 0 R >>".encode()
+            )
+            entries += f" /FontDescriptor {descriptor} 0 R"
+        font_refs[f"F{index + 1}"] = writer.add(f"<< {entries} >>".encode())
+    fonts = " ".join(f"/{name} {ref} 0 R" for name, ref in font_refs.items())
+
+    page_refs = []
+    for page_number in range(1, spec.pages + 1):
+        if spec.image_every and page_number % spec.image_every == 0:
+            image = writer.add_stream(
+                _image_data(spec, rng),
+                f" /Type /XObject /Subtype /Image /Width {spec.image_size} /Height {spec.image_size}"
+                f" /ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode",
+                compress=False
+            )
+            content = writer.add_stream(
+                f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im1 Do Q".encode()
+            )
+            resources = f"<< /XObject << /Im1 {image} 0 R >> >>"
+        else:
+            content = writer.add_stream(_text_content(spec, rng))
+            resources = f"<< /Font << {fonts} >> >>"
+        page_refs.append(writer.add(
+            f"<< /Type /Page /Parent {pages_root} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources {resources} /Contents {content} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    writer.set(pages_root, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode())
+    writer.set(catalog, f"<< /Type /Catalog /Pages {pages_root} 0 R >>".encode())
+    return writer.render(catalog)
+
+
+def build_corpus() -> Dict[str, bytes]:
+    """Returns every corpus document, by name."""
+    return {spec.name: build_pdf(spec) for spec in CORPUS}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", type=Path, default=Path(__file__).resolve().parent / "pdf_corpus")
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for name, data in build_corpus().items():
+        (args.out / f"{name}.pdf").write_bytes(data)
+        print(f"{name}.pdf  {len(data) / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
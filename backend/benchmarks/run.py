@@ -0,0 +1,190 @@
+"""
+Runs the end-to-end load test: starts the fake Gemini and Arbeitnow
+servers, migrates the benchmark database, boots app.main:app with uvicorn
+against them, drives mixed traffic (see loadgen) and writes the results,
+tagged with the current commit, to benchmarks/results/.
+
+Use a database of its own: results are only comparable between runs that
+start from the same state, which is what --fresh-db is for (it drops and
+recreates every table).
+
+    cd backend
+    python -m benchmarks.run \\
+        --database-url postgresql+asyncpg://postgres:pw@localhost:5432/skillsync_bench \\
+        --fresh-db --users 20 --duration 60
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+import httpx
+
+from benchmarks import loadgen
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _start(command: list, env: dict, name: str) -> subprocess.Popen:
+    print(f"Starting {name}: {' '.join(command)}")
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+def _stop(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    """Waits until url answers 200 (the app's /ready is 503 while warming up)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before starting")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} was not ready within {timeout:.0f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"),
+                        help="Benchmark database (or BENCH_DATABASE_URL)")
+    parser.add_argument("--fresh-db", action="store_true",
+                        help="Drop and recreate all tables before the run")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--gemini-port", type=int, default=8101)
+    parser.add_argument("--gemini-latency-ms", type=float, default=800.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-payload-chars", type=int, default=2000)
+    parser.add_argument("--jobs-port", type=int, default=8102)
+    parser.add_argument("--jobs-latency-ms", type=float, default=300.0)
+    parser.add_argument("--jobs-error-rate", type=float, default=0.0)
+    parser.add_argument("--jobs-description-chars", type=int, default=3000)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra settings for the app, e.g. DB_POOL_SIZE=20 (repeatable)")
+    parser.add_argument("--label", default="", help="Free-text note stored with the results")
+    loadgen.add_load_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    # Untracked files (earlier results, say) don't change what's measured
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no", "--", "."))
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    output = args.output or RESULTS_DIR / (
+        f"{started_at:%Y%m%dT%H%M%S}-{commit}{'-dirty' if dirty else ''}.json"
+    )
+
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    app_env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "GOOGLE_API_KEY": "fake-key",
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key"),
+        "GEMINI_TRANSPORT": "rest",
+        "GEMINI_API_BASE_URL": f"http://127.0.0.1:{args.gemini_port}",
+        "ARBEITNOW_API_URL": f"http://127.0.0.1:{args.jobs_port}/api/job-board-api",
+        "JOB_WORKERS": "0",
+    }
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        app_env[key] = value
+
+    with ExitStack() as stack:
+        gemini = _start([
+            sys.executable, "-m", "benchmarks.fake_gemini", "--port", str(args.gemini_port),
+            "--latency-ms", str(args.gemini_latency_ms),
+            "--error-rate", str(args.gemini_error_rate),
+            "--payload-chars", str(args.gemini_payload_chars),
+            "--seed", str(args.seed),
+        ], os.environ.copy(), "fake Gemini")
+        stack.callback(_stop, gemini)
+        jobs = _start([
+            sys.executable, "-m", "benchmarks.fake_arbeitnow", "--port", str(args.jobs_port),
+            "--latency-ms", str(args.jobs_latency_ms),
+            "--error-rate", str(args.jobs_error_rate),
+            "--description-chars", str(args.jobs_description_chars),
+            "--seed", str(args.seed),
+        ], os.environ.copy(), "fake Arbeitnow")
+        stack.callback(_stop, jobs)
+
+        if args.fresh_db:
+            subprocess.run(["alembic", "downgrade", "base"], cwd=BACKEND_DIR, env=app_env, check=True)
+        subprocess.run(["alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=app_env, check=True)
+
+        app = _start([
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.app_port),
+            "--workers", str(args.app_workers), "--log-level", "warning",
+        ], app_env, "app")
+        stack.callback(_stop, app)
+
+        _wait_until_up(f"http://127.0.0.1:{args.gemini_port}/docs", gemini)
+        _wait_until_up(f"http://127.0.0.1:{args.jobs_port}/docs", jobs)
+        _wait_until_up(f"{app_url}/ready", app)
+
+        results = asyncio.run(loadgen.run_load(
+            app_url, users=args.users, duration=args.duration, mix=args.mix,
+            seed=args.seed, think_ms=args.think_ms, resume_path=args.resume,
+            duplicate_upload_rate=args.duplicate_upload_rate
+        ))
+        # Per-stage server timings (one worker's view with --app-workers > 1)
+        server_metrics = httpx.get(f"{app_url}/metrics", timeout=10.0).text
+
+    results["meta"] = {
+        "commit": commit,
+        "dirty": dirty,
+        "started_at": started_at.isoformat(),
+        "label": args.label,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "app_workers": args.app_workers,
+        "app_env": args.app_env,
+        "fakes": {
+            "gemini_latency_ms": args.gemini_latency_ms,
+            "gemini_error_rate": args.gemini_error_rate,
+            "gemini_payload_chars": args.gemini_payload_chars,
+            "jobs_latency_ms": args.jobs_latency_ms,
+            "jobs_error_rate": args.jobs_error_rate,
+            "jobs_description_chars": args.jobs_description_chars,
+        },
+    }
+
+    loadgen.print_report(results)
+    loadgen.write_results(results, output)
+    output.with_suffix(".metrics.txt").write_text(server_metrics)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -41,8 +41,12 @@ export const uploadResume = (file) => {
   return apiClient.post('/resume/upload', formData);
 };
 
-export const getResumeHistory = () => {
-  return apiClient.get('/resume/history');
+// One page of the user's resumes, newest first. Pass the previous page's
+// next_cursor to get the page after it.
+export const getResumeHistory = (cursor = null) => {
+  return apiClient.get('/resume/history/page', {
+    params: cursor ? { cursor } : {},
+  });
 };
 
 export const getSkillGapAnalysis = (resumeId, roleName, learningPreference) => {
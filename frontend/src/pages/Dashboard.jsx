@@ -17,6 +17,8 @@ function Dashboard() {
 
   // --- STATE ---
   const [resumeHistory, setResumeHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null); // next_cursor of the last loaded page
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [resumeSourceTab, setResumeSourceTab] = useState("upload"); // 'upload' or 'existing'
   const [selectedResumeId, setSelectedResumeId] = useState("");
 
@@ -39,10 +41,12 @@ function Dashboard() {
     const fetchHistory = async () => {
       try {
         const response = await getResumeHistory();
-        setResumeHistory(response.data);
+        const resumes = response.data.items;
+        setResumeHistory(resumes);
+        setHistoryCursor(response.data.next_cursor);
         // If user has history, default to selecting the latest one
-        if (response.data.length > 0) {
-          setSelectedResumeId(response.data[0].id); // Select the most recent
+        if (resumes.length > 0) {
+          setSelectedResumeId(resumes[0].id); // Select the most recent
           setResumeSourceTab("existing"); // Default to the 'existing' tab
         }
       } catch (err) {
@@ -57,6 +61,21 @@ function Dashboard() {
     }
   }, [isAuthenticated]); // <-- Dependency on isAuthenticated fixes the race condition
 
+  // --- Load the next page of older resumes ---
+  const handleLoadMoreHistory = async () => {
+    if (!historyCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const response = await getResumeHistory(historyCursor);
+      setResumeHistory((previous) => [...previous, ...response.data.items]);
+      setHistoryCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error("Failed to load more resumes:", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleFileChange = (e) => {
     setFile(e.target.files[0]);
   };
@@ -85,7 +104,8 @@ function Dashboard() {
 
         // Refresh history after new upload and select the new resume
         const historyResponse = await getResumeHistory();
-        setResumeHistory(historyResponse.data);
+        setResumeHistory(historyResponse.data.items);
+        setHistoryCursor(historyResponse.data.next_cursor);
         setSelectedResumeId(resumeId); // Select the new one
       } else {
         if (!selectedResumeId) {
@@ -225,6 +245,16 @@ function Dashboard() {
                     ))}
                   </select>
                 )}
+                {resumeSourceTab === "existing" && historyCursor && (
+                  <button
+                    type="button"
+                    onClick={handleLoadMoreHistory}
+                    disabled={isLoadingMore}
+                    className="mt-2 text-sm font-medium text-ocean-blue hover:text-royal-purple disabled:opacity-50"
+                  >
+                    {isLoadingMore ? "Loading..." : "Load older resumes"}
+                  </button>
+                )}
               </div>
             </div>
 